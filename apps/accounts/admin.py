@@ -1,10 +1,17 @@
+import re
+
 from django import forms
 
 from django.contrib.auth import admin as user_admin
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from accounts.models import User
+from accounts.models import AvatarJob, User
+from accounts.search import EmailMatch, search_email
+
+# local part, `@` and a dotted domain: the term can only start an address
+ADDRESS_RE = re.compile(r'[^@]+@[^@]+\.[^@]+')
 
 
 class UserCreationPopupForm(forms.ModelForm):
@@ -57,6 +64,20 @@ class UserAdmin(user_admin.UserAdmin):
             return self.add_popup_fieldsets
         return super().get_fieldsets(request, obj)
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Email-like terms use the indexed email search instead of
+        `icontains` over every search field: a complete address is
+        matched by prefix, fragments such as `@example.com` or `smith@`
+        by containment
+        """
+        term = search_term.strip()
+        if '@' not in term or any(char.isspace() for char in term):
+            return super().get_search_results(request, queryset, search_term)
+        if ADDRESS_RE.fullmatch(term):
+            return search_email(queryset, term, EmailMatch.PREFIX), False
+        return search_email(queryset, term, EmailMatch.CONTAINS), False
+
     def get_form(self, request, obj=None, **kwargs):
         """
         Use special form during user creation
@@ -69,3 +90,16 @@ class UserAdmin(user_admin.UserAdmin):
 
         defaults.update(kwargs)
         return super().get_form(request, obj, **defaults)
+
+
+@admin.register(AvatarJob)
+class AvatarJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'source', 'status', 'attempts', 'next_attempt_at', 'processed_at')
+    list_filter = ('status',)
+    raw_id_fields = ('user',)
+    ordering = ('-id',)
+    actions = ('requeue',)
+
+    @admin.action(description='Requeue selected jobs')
+    def requeue(self, request, queryset):
+        queryset.update(status=AvatarJob.Status.PENDING, attempts=0, next_attempt_at=timezone.now())
@@ -1,8 +1,18 @@
+from typing import Annotated
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from accounts.schemas.auth import TokenObtainPairOtherPayload
 from ninja import Router, File, UploadedFile, Query
 from ninja.errors import ValidationError, HttpError
 from ninja.pagination import paginate
 
+from accounts.avatars import check_avatar, save_avatar
+from accounts.export import CONTENT_TYPES, ExportFormat, aexport_rows, export_rows
 from accounts.models import User
 from accounts.schemas import (
     SignupPayload,
@@ -18,8 +28,23 @@ from accounts.schemas import (
     TokenRefreshOutputPayload,
     AccountResponse,
     UserEmailFilter,
+    AccountFields,
+    UserProfileFields,
 )
-from core.schemas import DefaultOKResponse, DefaultNotFoundResponse
+from core.http import conditional_response, make_etag
+from core.images import InvalidImage
+from core.pagination import CursorPagination
+from core.projection import get_schema_columns, project
+from core.routers import read_replica
+from core.models import UploadSession
+from core.schemas import (
+    DefaultDeleteResponse,
+    DefaultOKResponse,
+    DefaultNotFoundResponse,
+    UploadSessionPayload,
+    UploadSessionResponse,
+)
+from core.uploads import InvalidChunk, OffsetConflict, append_chunk, create_session, delete_session, open_session
 
 __all__ = (
     'accounts_router',
@@ -36,8 +61,8 @@ accounts_router = Router(tags=['Accounts'])
     `password_confirmation` field is optional.
     If provided, will be compared with the `password` field.''',
 )
-def signup(request, payload: SignupPayload):
-    return 200, payload.save()
+async def signup(request, payload: SignupPayload):
+    return 200, await payload.asave()
 
 
 @accounts_router.post(
@@ -46,8 +71,8 @@ def signup(request, payload: SignupPayload):
     response={200: TokenObtainPairResponse},
     description='''Logs in a user and returns a token pair.''',
 )
-def auth_pair(request, payload: TokenObtainPairPayload):
-    return 200, payload
+async def auth_pair(request, payload: TokenObtainPairPayload):
+    return 200, await payload.authenticate()
 
 
 @accounts_router.post(
@@ -55,11 +80,11 @@ def auth_pair(request, payload: TokenObtainPairPayload):
     response={200: TokenObtainPairResponse},
     description='''Logs in a user and returns a token pair.''',
 )
-def auth_pair_other(request, payload: TokenObtainPairOtherPayload):
+async def auth_pair_other(request, payload: TokenObtainPairOtherPayload):
     if not request.auth.is_superuser:
         raise HttpError(401, 'Unauthorized')
 
-    return 200, payload
+    return 200, await payload.authenticate()
 
 
 @accounts_router.post(
@@ -68,7 +93,7 @@ def auth_pair_other(request, payload: TokenObtainPairOtherPayload):
     response={200: TokenRefreshOutputResponse},
     description='''Refreshes an access token.''',
 )
-def auth_refresh(request, payload: TokenRefreshOutputPayload):
+async def auth_refresh(request, payload: TokenRefreshOutputPayload):
     return 200, payload
 
 
@@ -79,8 +104,8 @@ def auth_refresh(request, payload: TokenRefreshOutputPayload):
     description='''Sends an email message with a reset password token in it.
     If the provided email address doesn't exist in the database the request won't fail.''',
 )
-def forgot_password(request, payload: ForgotPasswordPayload):
-    payload.save()
+async def forgot_password(request, payload: ForgotPasswordPayload):
+    await payload.asave()
     return 200, {}
 
 
@@ -91,8 +116,8 @@ def forgot_password(request, payload: ForgotPasswordPayload):
     description='''Changes unauthorized user's password based on a provided token.
     If the provided token doesn't exist in or is expired request will fail.''',
 )
-def reset_password(request, payload: ResetPasswordPayload):
-    payload.save()
+async def reset_password(request, payload: ResetPasswordPayload):
+    await payload.asave()
     return 200, {}
 
 
@@ -103,8 +128,8 @@ def reset_password(request, payload: ResetPasswordPayload):
     description='''Verifies user's email address based on a provided token.
     If the provided token doesn't exist in the request won't fail.''',
 )
-def verify_email(request, payload: VerifyEmailPayload):
-    payload.save()
+async def verify_email(request, payload: VerifyEmailPayload):
+    await payload.asave()
     return 200, {}
 
 
@@ -113,8 +138,8 @@ def verify_email(request, payload: VerifyEmailPayload):
     response={200: DefaultOKResponse},
     description='''Sends an email message with an email confirmation token in it.''',
 )
-def resend_verify_email(request, payload: ResendVerifyEmailPayload):
-    payload.save(user=request.auth)
+async def resend_verify_email(request, payload: ResendVerifyEmailPayload):
+    await payload.asave(user=request.auth)
     return 200, {}
 
 
@@ -123,23 +148,48 @@ def resend_verify_email(request, payload: ResendVerifyEmailPayload):
     response={200: DefaultOKResponse},
     description='''Changes current user's password.''',
 )
-def change_password(request, payload: ChangePasswordPayload):
-    payload.save(user=request.auth)
+async def change_password(request, payload: ChangePasswordPayload):
+    await payload.asave(user=request.auth)
     return 200, {}
 
 
+def profile_not_modified(request, response: HttpResponse, user_id: int, updated_at, fields) -> HttpResponse | None:
+    etag = make_etag(user_id, updated_at.isoformat(), fields)
+    return conditional_response(request, response, etag, updated_at)
+
+
+async def get_profile(request, response: HttpResponse, user_id: int, fields: tuple[str, ...] | None = None):
+    """
+    Profile of `user_id` limited to `fields`, or `304 Not Modified` when
+    the client's copy is current. Only `updated_at` is read to validate
+    it, the row is fetched and serialized when it actually changed.
+    """
+    updated_at = await User.objects.filter(id=user_id).values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        return None
+
+    not_modified = profile_not_modified(request, response, user_id, updated_at, fields)
+    if not_modified is not None:
+        return not_modified
+
+    queryset = project(User.objects.filter(id=user_id), UserProfileResponse, values=True, fields=fields)
+    return await queryset.afirst()
+
+
 @accounts_router.get(
     '',
     url_name='user_profile',
     response={200: UserProfileResponse},
+    description='''Current user's profile.
+    `fields` limits the response to the listed fields.
+    Supports conditional requests with `If-None-Match` / `If-Modified-Since`.''',
 )
-def user_profile(request):
-    user = (
-        User.objects
-        .filter(id=request.auth.id)
-        .select_related('specialist__speciality')
-        .first()
-    )
+async def user_profile(request, response: HttpResponse, fields: Query[UserProfileFields]):
+    # `request.auth` is the current user loaded by authentication, no query needed
+    user = request.auth
+    not_modified = profile_not_modified(request, response, user.pk, user.updated_at, fields.apply(request))
+    if not_modified is not None:
+        return not_modified
     return 200, user
 
 
@@ -148,42 +198,202 @@ def user_profile(request):
     response={200: UserProfileResponse},
     url_name='avatar',
 )
-def avatar(request, file: File[UploadedFile]):
+async def avatar(request, file: File[UploadedFile]):
     if file.content_type not in ['image/jpg', 'image/jpeg', 'image/png']:
         raise ValidationError([{'type': 'content_type', 'msg': f'content/type - {file.content_type} is not allowed.'}])
-    if file.size > 5 * 1024 * 1024:  # 5 MB
+    if file.size > settings.AVATARS['MAX_SIZE']:
+        raise ValidationError([{'type': 'size', 'msg': 'file is too large.'}])
+    try:
+        info = await sync_to_async(check_avatar)(file)
+    except InvalidImage as e:
+        raise ValidationError([{'type': 'image', 'msg': str(e)}]) from e
+
+    await sync_to_async(save_avatar)(request.auth, file, info.format)
+    return 200, request.auth
+
+
+async def get_upload_session(request, upload_id: UUID) -> UploadSession | None:
+    return await UploadSession.objects.filter(
+        pk=upload_id, user=request.auth, expires_at__gt=timezone.now(),
+    ).afirst()
+
+
+def finalize_avatar(user: User, session: UploadSession):
+    with open_session(session) as file:
+        info = check_avatar(file)
+        save_avatar(user, file, info.format)
+    delete_session(session)
+
+
+@accounts_router.post(
+    'avatar/uploads/',
+    response={201: UploadSessionResponse},
+    description='''Starts a resumable avatar upload of `size` bytes, sent in chunks
+    with `PATCH avatar/uploads/{upload_id}/` and completed with `finalize/`.
+    `checksum`, e.g. `sha256 <base64 digest>`, is checked against the whole file.''',
+    url_name='create_avatar_upload',
+)
+async def create_avatar_upload(request, payload: UploadSessionPayload):
+    if payload.size > settings.AVATARS['MAX_SIZE']:
         raise ValidationError([{'type': 'size', 'msg': 'file is too large.'}])
+    try:
+        session = await sync_to_async(create_session)(request.auth, payload.size, payload.checksum)
+    except InvalidChunk as e:
+        raise ValidationError([{'type': 'checksum', 'msg': str(e)}]) from e
+    return 201, session
+
+
+@accounts_router.get(
+    'avatar/uploads/{upload_id}/',
+    response={200: UploadSessionResponse, 404: DefaultNotFoundResponse},
+    description='''State of a resumable avatar upload, `offset` is where to resume sending.''',
+    url_name='avatar_upload',
+)
+async def avatar_upload(request, response: HttpResponse, upload_id: UUID):
+    session = await get_upload_session(request, upload_id)
+    if session is None:
+        return 404, {}
+    response.headers['Upload-Offset'] = str(session.offset)
+    response.headers['Cache-Control'] = 'no-store'
+    return 200, session
+
+
+@accounts_router.patch(
+    'avatar/uploads/{upload_id}/',
+    response={200: UploadSessionResponse, 404: DefaultNotFoundResponse, 409: UploadSessionResponse},
+    description='''Appends the raw request body, `Content-Type: application/offset+octet-stream`,
+    at the `Upload-Offset` header, which must be the upload's current `offset`
+    (`409` with the current state otherwise). An optional `Upload-Checksum`
+    header, e.g. `sha256 <base64 digest>`, is checked against the chunk.''',
+    url_name='avatar_upload_chunk',
+)
+async def avatar_upload_chunk(request, response: HttpResponse, upload_id: UUID):
+    if request.content_type != 'application/offset+octet-stream':
+        msg = f'content/type - {request.content_type} is not allowed.'
+        raise ValidationError([{'type': 'content_type', 'msg': msg}])
+    try:
+        offset = int(request.headers['Upload-Offset'])
+        length = int(request.headers['Content-Length'])
+    except (KeyError, ValueError) as e:
+        raise ValidationError([{'type': 'headers', 'msg': 'Upload-Offset and Content-Length are required.'}]) from e
+
+    session = await get_upload_session(request, upload_id)
+    if session is None:
+        return 404, {}
+    try:
+        session.offset = await sync_to_async(append_chunk)(
+            session, offset, request, length, request.headers.get('Upload-Checksum', ''),
+        )
+    except OffsetConflict as e:
+        session.offset = e.offset
+        response.headers['Upload-Offset'] = str(session.offset)
+        return 409, session
+    except InvalidChunk as e:
+        raise ValidationError([{'type': 'chunk', 'msg': str(e)}]) from e
+
+    response.headers['Upload-Offset'] = str(session.offset)
+    return 200, session
+
 
-    request.auth.avatar.save(file.name, file)
+@accounts_router.post(
+    'avatar/uploads/{upload_id}/finalize/',
+    response={200: UserProfileResponse, 404: DefaultNotFoundResponse},
+    description='''Saves a completely sent resumable upload as the avatar.''',
+    url_name='finalize_avatar_upload',
+)
+async def finalize_avatar_upload(request, upload_id: UUID):
+    session = await get_upload_session(request, upload_id)
+    if session is None:
+        return 404, {}
+    try:
+        await sync_to_async(finalize_avatar)(request.auth, session)
+    except InvalidChunk as e:
+        raise ValidationError([{'type': 'upload', 'msg': str(e)}]) from e
+    except InvalidImage as e:
+        raise ValidationError([{'type': 'image', 'msg': str(e)}]) from e
     return 200, request.auth
 
 
+@accounts_router.delete(
+    'avatar/uploads/{upload_id}/',
+    response={200: DefaultDeleteResponse, 404: DefaultNotFoundResponse},
+    description='''Cancels a resumable avatar upload.''',
+    url_name='delete_avatar_upload',
+)
+async def delete_avatar_upload(request, upload_id: UUID):
+    session = await get_upload_session(request, upload_id)
+    if session is None:
+        return 404, {}
+    await sync_to_async(delete_session)(session)
+    return 200, {}
+
+
 @accounts_router.get(
     'profile/{user_id}/',
     response={200: UserProfileResponse, 404: DefaultNotFoundResponse},
+    description='''User's profile.
+    `fields` limits the response to the listed fields.
+    Supports conditional requests with `If-None-Match` / `If-Modified-Since`.''',
     url_name='get_user_profile',
 )
-def get_user_profile(request, user_id: int):
-    user = (
-        User.objects
-        .filter(id=user_id)
-        .select_related('specialist__speciality')
-        .first()
-    )
-    if not user:
+@read_replica
+async def get_user_profile(request, response: HttpResponse, user_id: int, fields: Query[UserProfileFields]):
+    user = await get_profile(request, response, user_id, fields.apply(request))
+    if user is None:
         return 404, {}
+    if isinstance(user, HttpResponse):
+        return user
     return 200, user
 
 
 @accounts_router.get(
     'users/',
     response=list[AccountResponse],
-    description='List of all accounts.',
+    description='''List of all accounts.
+    Paginated with opaque `next`/`previous` cursors,
+    `count` is estimated and only returned when `estimate_count` is set.
+    `fields` limits the items to the listed fields.''',
     url_name='get_accounts',
 )
-@paginate
-def get_accounts(request, filters: Query[UserEmailFilter]):
+@read_replica
+@paginate(CursorPagination)
+async def get_accounts(request, filters: Query[UserEmailFilter], fields: Query[AccountFields]):
     if not request.user.is_superuser:
         raise HttpError(401, 'Unauthorized')
 
-    return filters.apply_filters(User.objects.filter(is_superuser=False))
+    queryset = filters.apply_filters(User.objects.filter(is_superuser=False))
+    # `id` is always loaded, cursors are built from it
+    return project(queryset, AccountResponse, 'id', values=True, fields=fields.apply(request))
+
+
+@accounts_router.get(
+    'users/export/',
+    response={200: None},
+    description='''Streams all accounts matching the filters as NDJSON or CSV.
+    `fields` limits the exported columns. Superusers only.''',
+    url_name='export_accounts',
+)
+@read_replica
+async def export_accounts(
+        request,
+        filters: Query[UserEmailFilter],
+        fields: Query[AccountFields],
+        export_format: Annotated[ExportFormat, Query(alias='format')] = ExportFormat.NDJSON,
+):
+    if not request.auth.is_superuser:
+        raise HttpError(401, 'Unauthorized')
+
+    queryset = filters.apply_filters(User.objects.filter(is_superuser=False)).order_by('id')
+    # rows are read after the view returns, keep the replica picked for it
+    queryset = queryset.using(queryset.db)
+
+    columns = get_schema_columns(AccountResponse, User, fields.apply(request))
+    # Django buffers iterators not matching the server's handler into a list,
+    # stream with the async ORM under ASGI and a server-side cursor under WSGI
+    export = aexport_rows if isinstance(request, ASGIRequest) else export_rows
+    response = StreamingHttpResponse(
+        export(queryset, columns, export_format),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="users.{export_format.value}"'
+    return response
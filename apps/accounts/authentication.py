@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from ninja_extra.security import AsyncHttpBearer
+from ninja_jwt.authentication import JWTAuth
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken
+from ninja_jwt.settings import api_settings
+
+__all__ = (
+    'AsyncCachedJWTAuth',
+    'CachedJWTAuth',
+    'user_cache',
+)
+
+
+class UserCache:
+    """
+    Authenticated users keyed by id, kept in the Django cache `CACHE_ALIAS`.
+
+    The cache must be shared by all workers: `post_save` / `post_delete`
+    invalidate an entry in the process doing the write, and every other
+    worker has to see that immediately, e.g. a deactivated user. Without
+    `CACHE_ALIAS` users are loaded from the database on every request.
+    Writes bypassing signals, like `QuerySet.update()`, must call
+    `invalidate()` themselves.
+    """
+
+    key_prefix = 'accounts:auth-user:'
+
+    def __init__(self):
+        options = settings.AUTH_USER_CACHE
+        self.timeout = options['TIMEOUT']
+        self.cache_alias = options.get('CACHE_ALIAS')
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def make_key(self, user_id) -> str:
+        return f'{self.key_prefix}{user_id}'
+
+    # cache backends unpickle a new instance on every get, handlers
+    # can mutate request.auth without affecting other requests
+
+    def get(self, user_id):
+        if self.cache is None:
+            return None
+        return self.cache.get(self.make_key(user_id))
+
+    async def aget(self, user_id):
+        if self.cache is None:
+            return None
+        return await self.cache.aget(self.make_key(user_id))
+
+    def set(self, user):
+        if self.cache is not None:
+            self.cache.set(self.make_key(user.pk), user, self.timeout)
+
+    async def aset(self, user):
+        if self.cache is not None:
+            await self.cache.aset(self.make_key(user.pk), user, self.timeout)
+
+    def invalidate(self, user_id):
+        if self.cache is not None:
+            self.cache.delete(self.make_key(user_id))
+
+    def clear(self):
+        """
+        Drop every entry of the cache alias, meant for tests.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuth(JWTAuth):
+    """
+    JWTAuth which serves users from `user_cache` instead of
+    loading them from the database on every request.
+    """
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+    def get_user(self, validated_token):
+        user = user_cache.get(self.get_user_id(validated_token))
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        elif not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'))
+
+        return user
+
+
+class AsyncCachedJWTAuth(CachedJWTAuth, AsyncHttpBearer):
+    """
+    CachedJWTAuth for async operations, cache misses
+    are loaded with the async ORM.
+    """
+
+    async def authenticate(self, request, token):
+        request.user = AnonymousUser()
+        user = await self.aget_user(self.get_validated_token(token))
+        request.user = user
+        return user
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = await user_cache.aget(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_('User not found')) from e
+            await user_cache.aset(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'))
+
+        return user
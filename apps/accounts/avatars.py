@@ -0,0 +1,270 @@
+import logging
+from concurrent.futures import Executor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import AvatarJob, User
+from core.blobs import release_blobs, store_blob, store_blobs
+from core.images import EXTENSIONS, ImageInfo, InvalidImage, make_variants, normalize_image, probe_image
+
+__all__ = (
+    'avatar_url',
+    'check_avatar',
+    'claim_batch',
+    'process_batch',
+    'regenerate_variants',
+    'release_avatar',
+    'render_avatar',
+    'render_variants',
+    'save_avatar',
+    'variant_urls',
+)
+
+logger = logging.getLogger(__name__)
+
+
+def check_avatar(file: UploadedFile) -> ImageInfo:
+    """
+    Check the upload is an allowed image format of acceptable dimensions,
+    reading only its header.
+    """
+    options = settings.AVATARS
+    return probe_image(file, options['FORMATS'], options['MAX_PIXELS'])
+
+
+def save_avatar(user: User, file: UploadedFile, image_format: str) -> AvatarJob:
+    """
+    Store the upload as the user's avatar right away and queue it for
+    normalizing, which decodes the whole image and is left to a worker.
+    The previous avatar and its thumbnails are released.
+    """
+    with transaction.atomic():
+        name = store_blob(file, EXTENSIONS[image_format])
+        previous = User.objects.select_for_update().only('avatar', 'avatar_variants').get(pk=user.pk)
+        release_blobs([previous.avatar.name, *variant_names(previous.avatar_variants)])
+
+        user.avatar.name = name
+        user.avatar_variants = {}
+        user.save(update_fields=['avatar', 'avatar_variants', 'updated_at'])
+        return AvatarJob.objects.create(user=user, source=name)
+
+
+def render_variants(content: bytes, options: dict) -> dict[int, dict[str, bytes]]:
+    return make_variants(BytesIO(content), options['VARIANT_SIZES'], options['VARIANT_FORMATS'])
+
+
+def render_avatar(content: bytes, options: dict) -> tuple[bytes, str, dict[int, dict[str, bytes]]]:
+    """
+    Normalize an uploaded avatar and render its thumbnails from the
+    result. Runs in worker processes: bytes and `AVATARS` options in,
+    bytes out.
+    """
+    source = BytesIO(content)
+    probe_image(source, options['FORMATS'], options['MAX_PIXELS'])
+    normalized, extension = normalize_image(source, options['MAX_DIMENSION'])
+    return normalized, extension, render_variants(normalized, options)
+
+
+def get_avatar_storage():
+    return User._meta.get_field('avatar').storage
+
+
+def avatar_url(name: str | None) -> str | None:
+    return get_avatar_storage().url(name) if name else None
+
+
+def variant_urls(variants: dict[str, dict[str, str]]) -> dict[str, dict[str, str]]:
+    return {
+        size: {extension: avatar_url(name) for extension, name in formats.items()}
+        for size, formats in variants.items()
+    }
+
+
+def read_file(name: str) -> bytes:
+    with get_avatar_storage().open(name) as file:
+        return file.read()
+
+
+def store_variants(variants: dict[int, dict[str, bytes]]) -> dict[str, dict[str, str]]:
+    items = [
+        (str(size), extension, content) for size, formats in variants.items() for extension, content in formats.items()
+    ]
+    names = store_blobs((ContentFile(content), extension) for _, extension, content in items)
+
+    stored = {}
+    for (size, extension, _), name in zip(items, names, strict=True):
+        stored.setdefault(size, {})[extension] = name
+    return stored
+
+
+def variant_names(variants: dict[str, dict[str, str]]) -> set[str]:
+    return {name for formats in variants.values() for name in formats.values()}
+
+
+def swap_avatar(user_id: int, source: str, name: str, variants: dict[str, dict[str, str]]) -> bool:
+    """
+    Point the user's avatar at `name` and its `variants`, whose references
+    the caller holds, unless it's no longer `source` because the user
+    uploaded another one meanwhile. Either the replaced files or the
+    unused new ones are released.
+    """
+    with transaction.atomic():
+        user = User.objects.select_for_update().filter(pk=user_id).first()
+        current = user is not None and user.avatar.name == source
+        if current:
+            release_blobs([source, *variant_names(user.avatar_variants)])
+            user.avatar.name = name
+            user.avatar_variants = variants
+            user.save(update_fields=['avatar', 'avatar_variants', 'updated_at'])
+        else:
+            release_blobs([name, *variant_names(variants)])
+
+    return current
+
+
+def swap_variants(user_id: int, avatar: str, variants: dict[str, dict[str, str]]) -> bool:
+    """
+    Replace the thumbnails of the user's avatar if it's still `avatar`.
+    """
+    with transaction.atomic():
+        user = User.objects.select_for_update().filter(pk=user_id).first()
+        current = user is not None and user.avatar.name == avatar
+        if current:
+            release_blobs(variant_names(user.avatar_variants))
+            user.avatar_variants = variants
+            user.save(update_fields=['avatar_variants', 'updated_at'])
+        else:
+            release_blobs(variant_names(variants))
+
+    return current
+
+
+def release_avatar(user: User):
+    """
+    Release the files of a user's avatar, e.g. once the user is deleted.
+    """
+    release_blobs([user.avatar.name, *variant_names(user.avatar_variants)])
+
+
+def get_backoff(attempts: int) -> timedelta:
+    options = settings.AVATARS
+    delay = options['BACKOFF'] * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, options['MAX_BACKOFF']))
+
+
+def claim_batch(size: int) -> list[AvatarJob]:
+    """
+    Lease up to `size` due jobs, hidden from other workers until
+    `LEASE` seconds pass so a crashed worker's jobs are retried.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            AvatarJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=AvatarJob.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:size]
+        )
+        lease = timedelta(seconds=settings.AVATARS['LEASE'])
+        AvatarJob.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+
+    return list(AvatarJob.objects.filter(id__in=ids).order_by('id'))
+
+
+def complete_job(job: AvatarJob, normalized: bytes, extension: str, variants: dict[int, dict[str, bytes]]) -> bool:
+    """
+    Store a rendered avatar and swap it in. Returns `False` when the
+    user uploaded another avatar in the meantime.
+    """
+    name = store_blob(ContentFile(normalized), extension)
+    return swap_avatar(job.user_id, job.source, name, store_variants(variants))
+
+
+def mark_done(job: AvatarJob):
+    job.status = AvatarJob.Status.DONE
+    job.attempts += 1
+    job.processed_at = timezone.now()
+    job.last_error = ''
+    job.save(update_fields=['status', 'attempts', 'processed_at', 'last_error'])
+
+
+def mark_failed(job: AvatarJob, error: Exception):
+    job.attempts += 1
+    job.last_error = repr(error)
+
+    # broken and deleted uploads won't get better with retries
+    permanent = isinstance(error, InvalidImage | FileNotFoundError)
+    if permanent or job.attempts >= settings.AVATARS['MAX_ATTEMPTS']:
+        job.status = AvatarJob.Status.FAILED
+        logger.error('Avatar job %s failed after %s attempts: %r', job.pk, job.attempts, error)
+    else:
+        job.next_attempt_at = timezone.now() + get_backoff(job.attempts)
+        logger.warning('Avatar job %s failed, attempt %s: %r', job.pk, job.attempts, error)
+
+    job.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error'])
+
+
+def process_batch(executor: Executor, size: int) -> dict:
+    """
+    Process one batch of jobs. Images are decoded and resized on
+    `executor`, a process pool, files and rows are written from the
+    calling thread.
+    """
+    jobs = claim_batch(size)
+    stats = {'done': 0, 'skipped': 0, 'failed': 0}
+
+    futures = {}
+    for job in jobs:
+        try:
+            futures[job] = executor.submit(render_avatar, read_file(job.source), settings.AVATARS)
+        except Exception as e:
+            mark_failed(job, e)
+            stats['failed'] += 1
+
+    for job, future in futures.items():
+        try:
+            current = complete_job(job, *future.result())
+        except Exception as e:
+            mark_failed(job, e)
+            stats['failed'] += 1
+            continue
+
+        mark_done(job)
+        stats['done' if current else 'skipped'] += 1
+
+    return stats
+
+
+def regenerate_variants(executor: Executor, users: list[User]) -> dict:
+    """
+    Render the thumbnails of `users`' current avatars again on `executor`,
+    e.g. after `VARIANT_SIZES` or `VARIANT_FORMATS` changed.
+    """
+    stats = {'done': 0, 'skipped': 0, 'failed': 0}
+
+    futures = {}
+    for user in users:
+        try:
+            futures[user] = executor.submit(render_variants, read_file(user.avatar.name), settings.AVATARS)
+        except Exception as e:
+            logger.error('Reading the avatar of user %s failed: %r', user.pk, e)
+            stats['failed'] += 1
+
+    for user, future in futures.items():
+        try:
+            current = swap_variants(user.pk, user.avatar.name, store_variants(future.result()))
+        except Exception as e:
+            logger.error('Rendering thumbnails of user %s failed: %r', user.pk, e)
+            stats['failed'] += 1
+            continue
+
+        stats['done' if current else 'skipped'] += 1
+
+    return stats
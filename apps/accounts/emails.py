@@ -10,13 +10,13 @@ __all__ = (
 )
 
 
-def send_email_address_confirmation(user):
+def send_email_address_confirmation(user, token: str):
     subject = 'Confirmez votre adresse email - {site_name}'.format(
         site_name=settings.SITE_NAME
     )
 
     action_url = build_client_absolute_url('/confirm-email-success')
-    action_url += f'?email_confirmation_token={user.email_confirmation_token}'
+    action_url += f'?email_confirmation_token={token}'
 
     send_email(
         subject=subject,
@@ -31,13 +31,13 @@ def send_email_address_confirmation(user):
     )
 
 
-def send_forgot_password_request(user):
+def send_forgot_password_request(user, token: str):
     subject = 'Réinitialisez votre mot de passe - {site_name}'.format(
         site_name=settings.SITE_NAME
     )
 
     action_url = build_client_absolute_url('/reset-password')
-    action_url += f'?reset_password_token={user.reset_password_token}'
+    action_url += f'?reset_password_token={token}'
     send_email(
         subject=subject,
         template_name='accounts/emails/forgot_password_request.html',
@@ -0,0 +1,85 @@
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from enum import StrEnum
+
+import orjson
+from django.db.models import QuerySet
+
+from core.utils import batched
+
+__all__ = (
+    'ExportFormat',
+    'aexport_rows',
+    'export_rows',
+)
+
+CHUNK_SIZE = 2000
+
+
+class ExportFormat(StrEnum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+CONTENT_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv; charset=utf-8',
+}
+
+
+def encode_header(columns: tuple[str, ...], export_format: ExportFormat) -> bytes:
+    if export_format != ExportFormat.CSV:
+        return b''
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue().encode()
+
+
+def encode_batch(rows: list[dict], columns: tuple[str, ...], export_format: ExportFormat) -> bytes:
+    if export_format == ExportFormat.NDJSON:
+        return b''.join(orjson.dumps(row, default=str) + b'\n' for row in rows)
+
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, columns).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def export_rows(
+        queryset: QuerySet,
+        columns: tuple[str, ...],
+        export_format: ExportFormat,
+        chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encode `columns` of `queryset` in `export_format`, one chunk of bytes
+    per `chunk_size` rows. Rows are read with a server-side cursor where
+    the database supports it, so memory use doesn't grow with the table.
+    """
+    yield encode_header(columns, export_format)
+    yield from (encode_batch(batch, columns, export_format) for batch in batched(
+        queryset.values(*columns).iterator(chunk_size=chunk_size), chunk_size,
+    ))
+
+
+async def aexport_rows(
+        queryset: QuerySet,
+        columns: tuple[str, ...],
+        export_format: ExportFormat,
+        chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    yield encode_header(columns, export_format)
+    async for batch in abatched(queryset.values(*columns).aiterator(chunk_size=chunk_size), chunk_size):
+        yield encode_batch(batch, columns, export_format)
+
+
+async def abatched(rows: AsyncIterable, size: int) -> AsyncIterator[list]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+__all__ = (
+    'HashingSaturated',
+    'acheck_user_password',
+    'amake_password',
+    'aset_user_password',
+    'hashing_executor',
+)
+
+
+class HashingSaturated(Exception):
+    """
+    Raised when the hashing executor has no free slot,
+    the API answers it with 503.
+    """
+
+
+class HashingExecutor:
+    """
+    Runs password hashing on a bounded thread pool. PBKDF2 releases
+    the GIL in hashlib, so hashing threads don't stall request threads
+    or the event loop. At most `max_workers + max_pending` jobs are
+    accepted, further submissions fail fast with `HashingSaturated`.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='password-hashing')
+            return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashingSaturated()
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def arun(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+hashing_executor = HashingExecutor(
+    max_workers=settings.PASSWORD_HASHING['WORKERS'],
+    max_pending=settings.PASSWORD_HASHING['MAX_PENDING'],
+)
+
+
+def must_update(encoded: str) -> bool:
+    preferred = hashers.get_hasher()
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+async def amake_password(password: str) -> str:
+    return await hashing_executor.arun(hashers.make_password, password)
+
+
+async def aset_user_password(user, password: str):
+    """
+    `AbstractBaseUser.set_password` with the hashing done on the executor.
+    """
+    user.password = await amake_password(password)
+    user._password = password
+
+
+async def acheck_user_password(user, password: str) -> bool:
+    """
+    `AbstractBaseUser.check_password` with the hashing done on the executor,
+    outdated hashes are upgraded like Django does.
+    """
+    valid = await hashing_executor.arun(hashers.check_password, password, user.password)
+    if valid and must_update(user.password):
+        await aset_user_password(user, password)
+        await user.asave(update_fields=['password'])
+    return valid
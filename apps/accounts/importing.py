@@ -0,0 +1,172 @@
+import csv
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import IO
+
+import orjson
+from django.contrib.auth import hashers
+from django.db import IntegrityError, transaction
+from pydantic import ValidationError
+
+from accounts.export import ExportFormat
+from accounts.models import User
+from accounts.schemas import SignupPayload
+from core.utils import batched
+
+__all__ = (
+    'InvalidRow',
+    'UserImporter',
+    'read_rows',
+)
+
+# passwords per task sent to the hashing processes, one hash is ~100ms+
+HASH_CHUNK_SIZE = 16
+
+
+@dataclass(frozen=True)
+class InvalidRow:
+    """
+    A line which couldn't be parsed into a row, e.g. malformed JSON.
+    """
+
+    message: str
+
+
+def read_rows(file: IO[str], import_format: ExportFormat) -> Iterator[tuple[int, dict | InvalidRow]]:
+    """
+    Stream `(line number, row)` pairs from a CSV file with a header
+    or from NDJSON, without loading the file in memory. Unparsable
+    lines are yielded as `InvalidRow`, so one doesn't stop the import.
+    """
+    if import_format == ExportFormat.CSV:
+        reader = csv.DictReader(file)
+        for row in reader:
+            # empty cells are missing values, not empty strings
+            yield reader.line_num, {key: value for key, value in row.items() if key and value != ''}
+        return
+
+    for line_num, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_num, InvalidRow(f'row: not valid JSON, {e}')
+
+
+class UserImporter:
+    """
+    Creates users from rows validated like `SignupPayload`, `batch_size`
+    at a time: one query checks the emails of a batch, passwords are
+    hashed on `executor` (a process pool, hashing is CPU bound) and the
+    batch is inserted with a single `bulk_create`.
+
+    `bulk_create` doesn't send `post_save`, so no confirmation emails
+    are sent and `user_created` receivers don't run for imported users.
+    With `prehashed` the password column holds encoded hashes,
+    e.g. exported from another Django project, and is stored as is.
+    """
+
+    def __init__(self, executor: Executor, batch_size: int = 1000, prehashed: bool = False):
+        self.executor = executor
+        self.batch_size = batch_size
+        self.prehashed = prehashed
+        self.errors = []
+        self.stats = {'rows': 0, 'created': 0, 'invalid': 0, 'duplicate': 0, 'seconds': 0.0}
+
+    @property
+    def throughput(self) -> float:
+        """
+        Created users per second.
+        """
+        if not self.stats['seconds']:
+            return 0.0
+        return self.stats['created'] / self.stats['seconds']
+
+    def import_rows(self, rows: Iterable[tuple[int, dict | InvalidRow]]) -> Iterator[dict]:
+        """
+        Import `rows`, yielding the running stats after every batch.
+        """
+        for batch in batched(rows, self.batch_size):
+            started = time.monotonic()
+            self.import_batch(batch)
+            self.stats['seconds'] += time.monotonic() - started
+            yield self.stats
+
+    def import_batch(self, batch: list[tuple[int, dict | InvalidRow]]):
+        self.stats['rows'] += len(batch)
+
+        payloads = {}
+        for line_num, row in batch:
+            if isinstance(row, InvalidRow):
+                self.add_error(line_num, 'invalid', row.message)
+                continue
+            payload = self.validate(line_num, row)
+            if payload is None:
+                continue
+            if payload.email in payloads:
+                self.add_error(line_num, 'duplicate', f'email {payload.email} repeats an earlier row')
+                continue
+            payloads[payload.email] = (line_num, payload)
+
+        self.drop_existing(payloads)
+
+        if not payloads:
+            return
+
+        passwords = [payload.password for _, payload in payloads.values()]
+        if not self.prehashed:
+            passwords = self.executor.map(hashers.make_password, passwords, chunksize=HASH_CHUNK_SIZE)
+
+        users = {
+            payload.email: User(
+                email=payload.email, first_name=payload.first_name, last_name=payload.last_name, password=password,
+            )
+            for (_, payload), password in zip(payloads.values(), passwords, strict=True)
+        }
+        while users:
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users.values(), batch_size=self.batch_size)
+                break
+            except IntegrityError:
+                # a concurrent signup took emails since they were checked
+                if not self.drop_existing(payloads):
+                    raise
+                users = {email: user for email, user in users.items() if email in payloads}
+
+        self.stats['created'] += len(users)
+
+    def drop_existing(self, payloads: dict[str, tuple[int, SignupPayload]]) -> set[str]:
+        """
+        Report and remove the `payloads` whose email is already used.
+        """
+        existing = set(User.objects.filter(email__in=payloads).values_list('email', flat=True))
+        for email in existing:
+            line_num, _ = payloads.pop(email)
+            self.add_error(line_num, 'duplicate', f'email {email} is already used')
+        return existing
+
+    def validate(self, line_num: int, row: dict) -> SignupPayload | None:
+        try:
+            payload = SignupPayload.model_validate(row)
+        except ValidationError as e:
+            self.add_error(line_num, 'invalid', '; '.join(
+                f'{".".join(map(str, error["loc"])) or "row"}: {error["msg"]}' for error in e.errors()
+            ))
+            return None
+
+        payload.email = User.objects.normalize_email(payload.email)
+        if self.prehashed:
+            try:
+                hashers.identify_hasher(payload.password)
+            except ValueError:
+                self.add_error(line_num, 'invalid', 'password: not a known password hash')
+                return None
+        return payload
+
+    def add_error(self, line_num: int, kind: str, message: str):
+        self.stats[kind] += 1
+        self.errors.append((line_num, message))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import UserToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email confirmation and password reset tokens.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = UserToken.objects.filter(expires_at__lte=timezone.now())
+
+        total = 0
+        while True:
+            # bounded deletes keep locks and transactions short on big tables
+            pks = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+            total += UserToken.objects.filter(pk__in=pks).delete()[0]
+
+        self.stdout.write(f'{total} expired token(s) deleted')
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.export import CHUNK_SIZE, ExportFormat, export_rows
+from accounts.models import User
+from accounts.schemas import AccountFields, AccountResponse, UserEmailFilter
+from core.projection import get_schema_columns
+
+
+class Command(BaseCommand):
+    help = 'Export accounts as NDJSON or CSV, with the filters of the users/ endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=[f.value for f in ExportFormat], default=ExportFormat.NDJSON.value)
+        parser.add_argument('--email', help='Filter by email.')
+        parser.add_argument('--email-match', default='contains', help='exact, prefix or contains.')
+        parser.add_argument('--fields', help='Comma separated columns, all by default.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--output', help='File to write to, stdout by default.')
+
+    def handle(self, *args, **options):
+        try:
+            filters = UserEmailFilter(email=options['email'], email_match=options['email_match'])
+            fields = AccountFields(fields=options['fields'])
+        except ValueError as e:
+            raise CommandError(e) from e
+
+        queryset = filters.apply_filters(User.objects.filter(is_superuser=False)).order_by('id')
+        selected = tuple(fields.fields.split(',')) if fields.fields else None
+        columns = get_schema_columns(AccountResponse, User, selected)
+        chunks = export_rows(queryset, columns, ExportFormat(options['format']), options['chunk_size'])
+
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
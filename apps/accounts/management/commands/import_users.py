@@ -0,0 +1,47 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from accounts.export import ExportFormat
+from accounts.importing import UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Import accounts from a CSV (with a header) or NDJSON file with email, password, '
+        'first_name and last_name columns. Rows are validated like signups, existing emails are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, - for stdin.')
+        parser.add_argument('--format', choices=[f.value for f in ExportFormat], help='Guessed from the extension.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Password hashing processes.')
+        parser.add_argument('--prehashed', action='store_true', help='Passwords are already Django password hashes.')
+
+    def handle(self, *args, **options):
+        import_format = options['format']
+        if import_format is None:
+            import_format = ExportFormat.CSV if options['path'].endswith('.csv') else ExportFormat.NDJSON
+
+        file = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        try:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+                importer = UserImporter(executor, options['batch_size'], options['prehashed'])
+                for stats in importer.import_rows(read_rows(file, ExportFormat(import_format))):
+                    self.report_errors(importer)
+                    self.stdout.write(
+                        'rows: {rows}, created: {created}, invalid: {invalid}, duplicate: {duplicate}'.format(**stats)
+                        + f', throughput: {importer.throughput:.1f} users/s',
+                    )
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+    def report_errors(self, importer: UserImporter):
+        for line_num, message in importer.errors:
+            self.stderr.write(f'line {line_num}: {message}')
+        importer.errors.clear()
@@ -0,0 +1,31 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Normalize uploaded avatars and render their thumbnails.'
+
+    def add_arguments(self, parser):
+        options = settings.AVATARS
+        parser.add_argument('--workers', type=int, default=options['WORKERS'], help='Image processing processes.')
+        parser.add_argument('--batch-size', type=int, default=options['BATCH_SIZE'])
+        parser.add_argument('--poll-interval', type=float, default=options['POLL_INTERVAL'])
+        parser.add_argument('--once', action='store_true', help='Process due jobs and exit.')
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            while True:
+                stats = process_batch(executor, options['batch_size'])
+                if any(stats.values()):
+                    self.stdout.write('done: {done}, skipped: {skipped}, failed: {failed}'.format(**stats))
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,32 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import regenerate_variants
+from accounts.models import User
+from core.utils import batched
+
+
+class Command(BaseCommand):
+    help = 'Render avatar thumbnails again for existing users, e.g. after the variant settings changed.'
+
+    def add_arguments(self, parser):
+        options = settings.AVATARS
+        parser.add_argument('--workers', type=int, default=options['WORKERS'], help='Image processing processes.')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--missing', action='store_true', help='Only users without thumbnails.')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(avatar='').exclude(avatar__isnull=True).only('id', 'avatar', 'avatar_variants')
+        if options['missing']:
+            users = users.filter(avatar_variants={})
+
+        totals = {'done': 0, 'skipped': 0, 'failed': 0}
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            rows = users.order_by('id').iterator(chunk_size=options['batch_size'])
+            for batch in batched(rows, options['batch_size']):
+                stats = regenerate_variants(executor, batch)
+                totals = {key: totals[key] + stats[key] for key in totals}
+                self.stdout.write('done: {done}, skipped: {skipped}, failed: {failed}'.format(**totals))
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Indexes backing accounts.search, they rely on postgres specific
+# operator classes so other backends (sqlite in tests) skip them.
+FORWARD_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS accounts_user_email_lower_idx '
+    'ON accounts_user (LOWER(email) text_pattern_ops)',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS accounts_user_email_trgm_idx '
+    'ON accounts_user USING gin (LOWER(email) gin_trgm_ops)',
+)
+
+REVERSE_SQL = (
+    'DROP INDEX CONCURRENTLY IF EXISTS accounts_user_email_trgm_idx',
+    'DROP INDEX CONCURRENTLY IF EXISTS accounts_user_email_lower_idx',
+)
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_postgres_sql(FORWARD_SQL), run_postgres_sql(REVERSE_SQL)),
+    ]
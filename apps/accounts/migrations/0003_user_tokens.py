@@ -0,0 +1,83 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:35
+
+import hashlib
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hash_existing_tokens(apps, schema_editor):
+    """
+    Move plaintext tokens off the user table, keeping them usable.
+    """
+    User = apps.get_model('accounts', 'User')
+    UserToken = apps.get_model('accounts', 'UserToken')
+    now = timezone.now()
+
+    def digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    tokens = []
+    users = (
+        User.objects
+        .filter(models.Q(email_confirmation_token__isnull=False) | models.Q(reset_password_token__isnull=False))
+        .only('email_confirmation_token', 'reset_password_token', 'reset_password_request_date')
+    )
+    for user in users.iterator(chunk_size=2000):
+        if user.email_confirmation_token:
+            tokens.append(UserToken(
+                user_id=user.pk,
+                purpose='email_confirmation',
+                digest=digest(user.email_confirmation_token),
+                expires_at=now + timedelta(days=7),
+            ))
+        if user.reset_password_token:
+            requested_at = user.reset_password_request_date or now
+            tokens.append(UserToken(
+                user_id=user.pk,
+                purpose='reset_password',
+                digest=digest(user.reset_password_token),
+                expires_at=requested_at + timedelta(hours=24),
+            ))
+        if len(tokens) >= 2000:
+            UserToken.objects.bulk_create(tokens, ignore_conflicts=True)
+            tokens = []
+
+    UserToken.objects.bulk_create(tokens, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_email_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purpose', models.CharField(choices=[('email_confirmation', 'Email Confirmation'), ('reset_password', 'Reset Password')], max_length=32)),
+                ('digest', models.CharField(editable=False, max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='email_confirmation_token',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_password_request_date',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='reset_password_token',
+        ),
+    ]
@@ -1,6 +1,8 @@
+import hashlib
 import logging
 import secrets
 
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
@@ -12,7 +14,9 @@ logger = logging.getLogger(__name__)
 
 
 __all__ = (
+    'AvatarJob',
     'User',
+    'UserToken',
 )
 
 
@@ -49,14 +53,14 @@ class User(AbstractUser):
     last_name = models.CharField(max_length=150, null=True)
 
     email = models.EmailField(unique=True)
-    email_confirmation_token = models.CharField(max_length=64, editable=False, null=True)
-
-    reset_password_token = models.CharField(max_length=64, editable=False, null=True)
-    reset_password_request_date = models.DateTimeField(null=True)
 
     avatar = models.ImageField(upload_to=get_file_path, null=True, blank=True)
+    # thumbnails of `avatar`, `{size: {extension: name}}`, see accounts.avatars
+    avatar_variants = models.JSONField(default=dict, blank=True)
     is_verified = models.BooleanField(default=False)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     USERNAME_FIELD = 'email'
     username = None
     REQUIRED_FIELDS = []
@@ -66,18 +70,97 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
-    def generate_password_request_date(self):
-        self.reset_password_request_date = timezone.now()
+    def absolute_avatar_url(self):
+        return self.avatar.url
 
-    def is_password_token_fresh(self) -> bool:
-        if self.reset_password_request_date is None:
-            return True
 
-        return self.reset_password_request_date + timezone.timedelta(hours=24) > timezone.now()
+class UserTokenManager(models.Manager):
+    def issue(self, user, purpose: str) -> str:
+        """
+        Replace the user's token for `purpose` and return the raw
+        token, only its digest is stored.
+        """
+        token = UserToken.generate_token()
+        self.filter(user=user, purpose=purpose).delete()
+        self.create(
+            user=user,
+            purpose=purpose,
+            digest=UserToken.make_digest(token),
+            expires_at=timezone.now() + settings.USER_TOKEN_LIFETIMES[purpose],
+        )
+        return token
+
+    def valid(self, token: str, purpose: str):
+        return self.filter(
+            digest=UserToken.make_digest(token),
+            purpose=purpose,
+            expires_at__gt=timezone.now(),
+        )
+
+    async def aget_user(self, token: str, purpose: str):
+        """
+        Owner of a valid token, fetched with a single indexed lookup.
+        """
+        user_token = await self.valid(token, purpose).select_related('user').afirst()
+        return user_token.user if user_token else None
+
+
+class UserToken(models.Model):
+    """
+    Single use tokens sent to users by email, stored as SHA-256 digests.
+    """
+
+    class Purpose(models.TextChoices):
+        EMAIL_CONFIRMATION = 'email_confirmation'
+        RESET_PASSWORD = 'reset_password'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tokens')
+    purpose = models.CharField(max_length=32, choices=Purpose.choices)
+    digest = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = UserTokenManager()
+
+    def __str__(self):
+        return f'{self.user_id}:{self.purpose}'
 
     @staticmethod
     def generate_token() -> str:
-        return secrets.token_hex(32).replace('=', '0')
+        return secrets.token_hex(32)
 
-    def absolute_avatar_url(self):
-        return self.avatar.url
+    @staticmethod
+    def make_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AvatarJob(models.Model):
+    """
+    Uploaded avatar waiting to be normalized, processed by
+    `manage.py process_avatars`. `source` is the stored upload, the job
+    is skipped if the user has replaced it in the meantime.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='avatar_jobs')
+    source = models.CharField(max_length=255)
+
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='accounts_avatar_job_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.source}'
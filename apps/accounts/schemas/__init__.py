@@ -16,6 +16,8 @@ from .account import (
     ResendVerifyEmailPayload,
     AccountResponse,
     UserEmailFilter,
+    AccountFields,
+    UserProfileFields,
 )
 
 __all__ = (
@@ -33,4 +35,6 @@ __all__ = (
     'TokenRefreshOutputPayload',
     'AccountResponse',
     'UserEmailFilter',
+    'AccountFields',
+    'UserProfileFields',
 )
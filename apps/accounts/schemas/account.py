@@ -2,15 +2,20 @@ from enum import Enum
 
 import typing_extensions
 
+from asgiref.sync import sync_to_async
 from ninja_jwt.tokens import RefreshToken
-from pydantic import Field, EmailStr, field_validator
+from pydantic import Field, EmailStr
 from ninja import ModelSchema, Schema
 from pydantic import model_validator
-from django.contrib.auth.hashers import check_password
+from django.db import transaction
 
-from core.errors import in_use_error, invalid_token_error
+from core.errors import as_validation_error, in_use_error, incorrect_password_error, invalid_token_error
+from core.fields import SparseFieldsSchema, fields_query
 from accounts import emails
-from accounts.models import User
+from accounts.avatars import avatar_url, variant_urls
+from accounts.hashing import acheck_user_password, aset_user_password
+from accounts.models import User, UserToken
+from accounts.search import EmailMatch, search_email
 from accounts.schemas import UserSchema
 
 __all__ = (
@@ -23,9 +28,21 @@ __all__ = (
     'UserProfileResponse',
     'AccountResponse',
     'UserEmailFilter',
+    'AccountFields',
+    'UserProfileFields',
 )
 
 
+@sync_to_async
+def issue_and_notify(user, purpose: str, notify, save: bool = False):
+    """
+    Issue a token and queue its email in one transaction,
+    saving the user first when `save` is set.
+    """
+    with transaction.atomic():
+        if save:
+            user.save()
+        notify(user, UserToken.objects.issue(user, purpose))
 
 
 class SignupPayload(Schema):
@@ -36,30 +53,26 @@ class SignupPayload(Schema):
     first_name: str | None = Field(None, min_length=2, max_length=150)
     last_name: str | None = Field(None, min_length=2, max_length=150)
 
-    @field_validator('email', mode='after')
-    def validate_email(cls, email: EmailStr):
-        if User.objects.filter(email=email).exists():
-            raise in_use_error('email', email)
-        return email
-
     @model_validator(mode='after')
     def validate_passwords(self) -> typing_extensions.Self:
         if self.password_confirmation is not None and self.password != self.password_confirmation:
             raise ValueError('password do not match')
         return self
 
-    def save(self):
+    async def asave(self):
+        if await User.objects.filter(email=self.email).aexists():
+            raise as_validation_error(in_use_error('email', self.email), loc=('body', 'payload', 'email'))
+
         user = User(
             email=self.email,
             first_name=self.first_name,
             last_name=self.last_name,
-            email_confirmation_token=User.generate_token(),
         )
 
-        user.set_password(self.password)
-        user.save()
-
-        emails.send_email_address_confirmation(user)
+        await aset_user_password(user, self.password)
+        await issue_and_notify(
+            user, UserToken.Purpose.EMAIL_CONFIRMATION, emails.send_email_address_confirmation, save=True
+        )
 
         values = {}
         refresh = RefreshToken.for_user(user)
@@ -73,17 +86,13 @@ class SignupPayload(Schema):
 class ForgotPasswordPayload(Schema):
     email: EmailStr
 
-    def save(self):
-        user = User.objects.filter(email=self.email).first()
+    async def asave(self):
+        user = await User.objects.filter(email=self.email).afirst()
         if user is None:
             # fail silently to avoid getting attacked
             return
 
-        user.reset_password_token = User.generate_token()
-        user.generate_password_request_date()
-        user.save()
-
-        emails.send_forgot_password_request(user)
+        await issue_and_notify(user, UserToken.Purpose.RESET_PASSWORD, emails.send_forgot_password_request)
 
 
 class ChangePasswordPayload(Schema):
@@ -97,12 +106,13 @@ class ChangePasswordPayload(Schema):
             raise ValueError('passwords did not match')
         return self
 
-    def save(self, user):
-        if not check_password(self.old_password, user.password):
-            raise ValueError('current password is incorrect')
+    async def asave(self, user):
+        if not await acheck_user_password(user, self.old_password):
+            raise as_validation_error(incorrect_password_error(), loc=('body', 'payload', 'old_password'))
 
-        user.set_password(self.password)
-        user.save()
+        await aset_user_password(user, self.password)
+        # `user` is `request.auth`, possibly cached, never write its other fields back
+        await user.asave(update_fields=['password', 'updated_at'])
 
 
 class ResetPasswordPayload(Schema):
@@ -110,40 +120,44 @@ class ResetPasswordPayload(Schema):
     password: str
     password_confirmation: str | None = None
 
-    @field_validator('token', mode='after')
-    def validate_token(cls, token: str):
-        user = User.objects.filter(reset_password_token=token).first()
-        if user is None or not user.is_password_token_fresh():
-            raise invalid_token_error()
-
-        return token
-
     @model_validator(mode='after')
     def validate_passwords(self) -> typing_extensions.Self:
         if self.password_confirmation is not None and self.password != self.password_confirmation:
             raise ValueError('password do not match')
         return self
 
-    def save(self):
-        user = User.objects.filter(reset_password_token=self.token).first()
-        user.reset_password_token = None
-        user.reset_password_request_date = None
-        user.set_password(self.password)
-        user.save()
+    async def asave(self):
+        user = await UserToken.objects.aget_user(self.token, UserToken.Purpose.RESET_PASSWORD)
+        if user is None:
+            raise as_validation_error(invalid_token_error(), loc=('body', 'payload', 'token'))
+
+        await aset_user_password(user, self.password)
+        await user.asave()
+        await user.tokens.filter(purpose=UserToken.Purpose.RESET_PASSWORD).adelete()
 
 
 class VerifyEmailPayload(Schema):
     token: str = Field(..., min_length=1)
 
-    def save(self):
-        _ = (
-            User.objects
-                .filter(email_confirmation_token=self.token)
-                .update(email_confirmation_token=None)
-        )
+    async def asave(self):
+        _ = await UserToken.objects.valid(self.token, UserToken.Purpose.EMAIL_CONFIRMATION).adelete()
+
 
+class UserProfileResponse(ModelSchema, SparseFieldsSchema):
+    avatar: str | None = None
+    avatar_variants: dict[int, dict[str, str]] = Field(
+        default_factory=dict,
+        description='Square thumbnails of the avatar by size and format, e.g. `{"64": {"webp": url}}`.',
+    )
+
+    @staticmethod
+    def resolve_avatar(obj) -> str | None:
+        # profiles are served from model instances or projected rows
+        return avatar_url(obj['avatar'] if isinstance(obj, dict) else obj.avatar.name)
 
-class UserProfileResponse(ModelSchema):
+    @staticmethod
+    def resolve_avatar_variants(obj) -> dict[str, dict[str, str]]:
+        return variant_urls(obj['avatar_variants'] if isinstance(obj, dict) else obj.avatar_variants)
 
     class Meta:
         model = User
@@ -157,22 +171,25 @@ class UserProfileResponse(ModelSchema):
 
 class ResendVerifyEmailPayload(Schema):
     @staticmethod
-    def save(user):
-        user.refresh_from_db()
-
-        emails.send_email_address_confirmation(user)
+    async def asave(user):
+        await issue_and_notify(user, UserToken.Purpose.EMAIL_CONFIRMATION, emails.send_email_address_confirmation)
 
-class AccountResponse(Schema):
+class AccountResponse(SparseFieldsSchema):
     id: int
     email: str
     first_name: str | None = None
     last_name: str | None = None
 
 
+AccountFields = fields_query(AccountResponse)
+UserProfileFields = fields_query(UserProfileResponse)
+
+
 class UserEmailFilter(Schema):
     email: str | None = None
+    email_match: EmailMatch = EmailMatch.CONTAINS
 
     def apply_filters(self, queryset):
         if self.email:
-            queryset = queryset.filter(email__icontains=self.email)
+            queryset = search_email(queryset, self.email, self.email_match)
         return queryset
@@ -3,7 +3,8 @@ from pydantic import model_validator
 from ninja import Schema, ModelSchema
 from ninja_jwt.tokens import RefreshToken
 
-from core.errors import invalid_credentials_error
+from core.errors import as_validation_error, invalid_credentials_error
+from accounts.hashing import acheck_user_password
 from accounts.models import User
 
 __all__ = (
@@ -35,13 +36,12 @@ class TokenObtainPairPayload(ModelSchema):
         model = User
         model_fields = ["email", "password"]
 
-    @model_validator(mode='after')
-    def validate(self):
-        user = User.objects.filter(email=self.email).first()
+    async def authenticate(self) -> dict:
+        user = await User.objects.filter(email=self.email).afirst()
         if not user:
-            raise invalid_credentials_error()
-        if not user.check_password(self.password):
-            raise invalid_credentials_error()
+            raise as_validation_error(invalid_credentials_error())
+        if not await acheck_user_password(user, self.password):
+            raise as_validation_error(invalid_credentials_error())
         return self.get_token(user)
 
     @staticmethod
@@ -58,11 +58,10 @@ class TokenObtainPairOtherPayload(Schema):
     user_id: int | None = None
     email: str | None = None
 
-    @model_validator(mode='after')
-    def validate(self):
-        user = User.objects.filter(Q(email=self.email) | Q(id=self.user_id)).first()
+    async def authenticate(self) -> dict:
+        user = await User.objects.filter(Q(email=self.email) | Q(id=self.user_id)).afirst()
         if not user:
-            raise invalid_credentials_error()
+            raise as_validation_error(invalid_credentials_error())
         return self.get_token(user)
 
     @staticmethod
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
 import pytest
 
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+from ninja.errors import ValidationError as NinjaValidationError
 from pydantic import ValidationError
 
 from accounts.factory import UserFactory, InvitationFactory
@@ -10,7 +15,7 @@ from . import (
     ResetPasswordPayload,
     VerifyEmailPayload,
 )
-from ..models import User
+from ..models import User, UserToken
 
 
 @pytest.mark.django_db
@@ -27,7 +32,7 @@ def test_signup():
             'bio': 'test',
         }
     )
-    values = payload.save()
+    values = async_to_sync(payload.asave)()
     assert 'refresh' in values
     assert 'access' in values
     assert 'user' in values
@@ -40,8 +45,8 @@ def test_signup():
     assert user.last_name == 'test'
     assert user.bio == 'test'
 
-    with pytest.raises(ValidationError):
-        _ = SignupPayload.model_validate(
+    with pytest.raises(NinjaValidationError):  # email is already used
+        payload = SignupPayload.model_validate(
             {
                 'email': 'user@example.com',
                 'password': '1234',
@@ -50,6 +55,7 @@ def test_signup():
                 'bio': 'test',
             }
         )
+        async_to_sync(payload.asave)()
 
     with pytest.raises(ValidationError):  # password is required
         _ = SignupPayload.model_validate(
@@ -85,7 +91,7 @@ def test_signup():
             'referrer_code': user.referral_code,
         }
     )
-    _ = payload.save()
+    _ = async_to_sync(payload.asave)()
 
     assert User.objects.filter(email='user45@example.com').exists()
 
@@ -106,28 +112,23 @@ def test_forgot_password():
         _ = ForgotPasswordPayload.model_validate({'email': ''})
 
     payload = ForgotPasswordPayload.model_validate({'email': 'non-existing-email@example.com'})
-    payload.save()
+    async_to_sync(payload.asave)()
 
-    u.refresh_from_db()
-
-    assert u.reset_password_token is None
-    assert u.reset_password_request_date is None
+    assert not UserToken.objects.exists()
 
     payload = ForgotPasswordPayload.model_validate({'email': u.email})
-    payload.save()
-
-    u.refresh_from_db()
+    async_to_sync(payload.asave)()
 
-    assert u.reset_password_token is not None
-    assert u.reset_password_request_date is not None
+    token = UserToken.objects.get()
+    assert token.user == u
+    assert token.purpose == UserToken.Purpose.RESET_PASSWORD
+    assert token.expires_at > token.created_at
 
 
 @pytest.mark.django_db
 def test_reset_password():
     u = UserFactory()
-    u.reset_password_token = u.generate_token()
-    u.generate_password_request_date()
-    u.save()
+    token = UserToken.objects.issue(u, UserToken.Purpose.RESET_PASSWORD)
 
     _ = UserFactory.create_batch(size=5)
 
@@ -142,22 +143,32 @@ def test_reset_password():
 
     with pytest.raises(ValidationError):  # passwords must be the same
         _ = ResetPasswordPayload.model_validate({
-            'token': u.reset_password_token,
+            'token': token,
             'password': 'not-the-same',
             'password_confirmation': 'the-same-not',
         })
 
+    with pytest.raises(NinjaValidationError):  # token must exist
+        payload = ResetPasswordPayload.model_validate({'token': 'invalid', 'password': 'password'})
+        async_to_sync(payload.asave)()
+
+    with pytest.raises(NinjaValidationError):  # token must not be expired
+        UserToken.objects.update(expires_at=timezone.now())
+        payload = ResetPasswordPayload.model_validate({'token': token, 'password': 'password'})
+        async_to_sync(payload.asave)()
+
+    UserToken.objects.update(expires_at=timezone.now() + timedelta(hours=1))
     payload = ResetPasswordPayload.model_validate({
-        'token': u.reset_password_token,
+        'token': token,
         'password': 'password',
         'password_confirmation': 'password',
     })
-    payload.save()
+    async_to_sync(payload.asave)()
 
     u.refresh_from_db()
 
-    assert u.reset_password_token is None
-    assert u.reset_password_request_date is None
+    assert u.check_password('password')
+    assert not UserToken.objects.exists()
 
 
 @pytest.mark.django_db
@@ -181,7 +192,7 @@ def test_change_password():
         'password': '1234',
         'password_confirmation': '1234',
     })
-    payload.save(user=u)
+    async_to_sync(payload.asave)(user=u)
     u.refresh_from_db()
 
     assert u.password != p
@@ -196,23 +207,19 @@ def test_verify_email():
         _ = VerifyEmailPayload.model_validate({'token': ''})
 
     u = UserFactory()
-    token = u.generate_token()
-    u.email_confirmation_token = token
-    u.save()
+    token = UserToken.objects.issue(u, UserToken.Purpose.EMAIL_CONFIRMATION)
 
     payload = VerifyEmailPayload.model_validate({
         'token': 'non-existing-token',
     })
-    payload.save()
-    u.refresh_from_db()
+    async_to_sync(payload.asave)()
 
-    assert u.email_confirmation_token is not None
-    assert u.email_confirmation_token == token
+    assert u.tokens.filter(purpose=UserToken.Purpose.EMAIL_CONFIRMATION).exists()
+    assert u.tokens.get().digest == UserToken.make_digest(token)
 
     payload = VerifyEmailPayload.model_validate({
         'token': token,
     })
-    payload.save()
-    u.refresh_from_db()
+    async_to_sync(payload.asave)()
 
-    assert u.email_confirmation_token is None
+    assert not u.tokens.exists()
@@ -0,0 +1,37 @@
+from enum import StrEnum
+
+from django.db.models import QuerySet
+from django.db.models.functions import Lower
+
+__all__ = (
+    'EmailMatch',
+    'search_email',
+)
+
+
+class EmailMatch(StrEnum):
+    EXACT = 'exact'
+    PREFIX = 'prefix'
+    CONTAINS = 'contains'
+
+
+LOOKUPS = {
+    EmailMatch.EXACT: 'email_lower',
+    EmailMatch.PREFIX: 'email_lower__startswith',
+    EmailMatch.CONTAINS: 'email_lower__contains',
+}
+
+
+def search_email(queryset: QuerySet, term: str, match: EmailMatch = EmailMatch.CONTAINS) -> QuerySet:
+    """
+    Case-insensitive email search on `LOWER(email)`.
+
+    On postgres exact and prefix matches are served by the
+    `text_pattern_ops` index, contains by the `pg_trgm` GIN index
+    (see migration 0002). Other backends run the same query unindexed.
+    """
+    return (
+        queryset
+        .alias(email_lower=Lower('email'))
+        .filter(**{LOOKUPS[match]: term.lower()})
+    )
@@ -1,15 +1,54 @@
 import logging
+from functools import partial
 
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
 
+from accounts.authentication import user_cache
+from accounts.avatars import release_avatar
 from accounts.models import User
+from core.routers import pin_to_primary
 
 
 logger = logging.getLogger(__name__)
 
+# User creation hooks:
+# - `user_creating` is sent before the INSERT of a new user, receivers
+#   set fields on `user` so everything is stored with a single write.
+# - `user_created` is sent once the creating transaction commits, for
+#   side effects that must not run if the creation is rolled back.
+user_creating = Signal()
+user_created = Signal()
+
+
+@receiver(pre_save, sender=User)
+def pre_save_user(sender, instance, raw=False, **kwargs):
+    if instance._state.adding and not raw:
+        user_creating.send(sender=sender, user=instance)
+
+
+@receiver(post_save, sender=User)
+def post_save_user(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        transaction.on_commit(partial(user_created.send, sender=sender, user=instance), using=using)
+
 
 @receiver(post_save, sender=User)
-def post_save_user(sender, instance, created, **kwargs):
-    if created:
-        instance.save()
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, using=None, **kwargs):
+    # a concurrent request can cache the old row until the write commits,
+    # so the entry is dropped again once it is visible
+    user_cache.invalidate(instance.pk)
+    transaction.on_commit(partial(user_cache.invalidate, instance.pk), using=using)
+
+
+@receiver(post_save, sender=User)
+def pin_user_to_primary(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pin_to_primary(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def release_user_avatar(sender, instance, **kwargs):
+    release_avatar(instance)
@@ -4,8 +4,9 @@ import pytest
 
 from django.urls import reverse
 
-from accounts.factory import InvitationFactory
+from accounts.factory import UserFactory, InvitationFactory
 from accounts.models import Invitation
+from accounts.models import User
 
 
 @pytest.mark.django_db
@@ -20,6 +21,38 @@ def test_user_profile(logged_in):
     assert data['last_name'] == logged_in.user.last_name
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['user_profile', 'get_user_profile'])
+def test_user_profile_conditional(logged_in, url_name):
+    kwargs = {'user_id': logged_in.user.id} if url_name == 'get_user_profile' else {}
+    url = reverse(f'api:{url_name}', kwargs=kwargs)
+
+    response = logged_in.client.request('get', url)
+
+    assert response.status_code == 200
+    assert 'private' in response['Cache-Control']
+    etag = response['ETag']
+
+    response = logged_in.client.request('get', url, headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response['ETag'] == etag
+
+    response = logged_in.client.request('get', url, headers={'If-Modified-Since': response['Last-Modified']})
+
+    assert response.status_code == 304
+
+    logged_in.user.first_name = 'Changed'
+    logged_in.user.save()
+
+    response = logged_in.client.request('get', url, headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.json()['first_name'] == 'Changed'
+
+
 @pytest.mark.django_db
 def test_avatar(logged_in, image_file):
     image = image_file()
@@ -35,3 +68,119 @@ def test_avatar(logged_in, image_file):
     logged_in.user.refresh_from_db()
 
     assert logged_in.user.avatar.url is not None
+
+
+@pytest.mark.django_db
+def test_get_accounts(logged_in):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    users = UserFactory.create_batch(size=3)
+
+    response = logged_in.client.request('get', reverse('api:get_accounts'), payload={'limit': 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item['id'] for item in data['items']] == [u.id for u in users[:2]]
+    assert data['count'] is None
+    assert data['previous'] is None
+
+    response = logged_in.client.request('get', reverse('api:get_accounts'), payload={'cursor': data['next']})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item['id'] for item in data['items']] == [users[2].id]
+    assert data['next'] is None
+
+
+@pytest.mark.django_db
+def test_signup(api_client, mailoutbox):
+    response = api_client.request(
+        'post',
+        reverse('api:signup'),
+        payload={'email': 'new@example.com', 'password': 'password', 'first_name': 'New'},
+        content_type='application/json',
+    )
+
+    assert response.status_code == 200
+    assert response.json()['user']['email'] == 'new@example.com'
+    assert len(mailoutbox) == 1
+
+    response = api_client.request(
+        'post',
+        reverse('api:signup'),
+        payload={'email': 'new@example.com', 'password': 'password'},
+        content_type='application/json',
+    )
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'in_use'
+
+
+@pytest.mark.django_db
+def test_change_password(logged_in):
+    response = logged_in.client.request(
+        'put',
+        reverse('api:change_password'),
+        payload={'old_password': 'password', 'password': 'changed', 'password_confirmation': 'changed'},
+        content_type='application/json',
+    )
+
+    assert response.status_code == 200
+    logged_in.user.refresh_from_db()
+    assert logged_in.user.check_password('changed')
+
+
+@pytest.mark.django_db
+def test_change_password_keeps_other_fields(logged_in):
+    url = reverse('api:change_password')
+    payload = {'old_password': 'password', 'password': 'changed', 'password_confirmation': 'changed'}
+    # authenticate once so the request gets the cached user
+    logged_in.client.request('get', reverse('api:user_profile'))
+    User.objects.filter(pk=logged_in.user.pk).update(is_verified=True, first_name='Elsewhere')
+
+    response = logged_in.client.request('put', url, payload=payload, content_type='application/json')
+
+    assert response.status_code == 200
+    logged_in.user.refresh_from_db()
+    assert logged_in.user.check_password('changed')
+    assert (logged_in.user.is_verified, logged_in.user.first_name) == (True, 'Elsewhere')
+
+
+@pytest.mark.django_db
+def test_change_password_incorrect(logged_in):
+    payload = {'old_password': 'wrong', 'password': 'changed', 'password_confirmation': 'changed'}
+
+    response = logged_in.client.request(
+        'put', reverse('api:change_password'), payload=payload, content_type='application/json',
+    )
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'incorrect_password'
+
+
+@pytest.mark.django_db
+def test_sparse_fields(logged_in):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    users = UserFactory.create_batch(size=3)
+
+    response = logged_in.client.request('get', reverse('api:get_accounts'), payload={'fields': 'email', 'limit': 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['items'] == [{'email': u.email} for u in users[:2]]
+
+    response = logged_in.client.request('get', reverse('api:get_accounts'), payload={'cursor': data['next']})
+
+    assert [item['id'] for item in response.json()['items']] == [users[2].id]
+
+    url = reverse('api:get_user_profile', kwargs={'user_id': users[0].id})
+    response = logged_in.client.request('get', url, payload={'fields': 'email, is_verified'})
+
+    assert response.status_code == 200
+    assert response.json() == {'email': users[0].email, 'is_verified': users[0].is_verified}
+
+    response = logged_in.client.request('get', url, payload={'fields': 'email,password'})
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['query', 'fields']
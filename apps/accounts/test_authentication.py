@@ -0,0 +1,95 @@
+import pytest
+from asgiref.sync import async_to_sync
+from ninja_jwt.exceptions import AuthenticationFailed
+from ninja_jwt.tokens import RefreshToken
+
+from django.test import RequestFactory
+
+from .authentication import AsyncCachedJWTAuth, CachedJWTAuth, UserCache, user_cache
+
+
+def make_request(user):
+    token = RefreshToken.for_user(user).access_token
+    return RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def authenticate(user):
+    return CachedJWTAuth()(make_request(user))
+
+
+def aauthenticate(user):
+    return async_to_sync(AsyncCachedJWTAuth())(make_request(user))
+
+
+@pytest.mark.django_db
+def test_cached_jwt_auth(auth_user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        user = authenticate(auth_user)
+
+    assert user == auth_user
+
+    with django_assert_num_queries(0):
+        cached = authenticate(auth_user)
+
+    assert cached == auth_user
+    assert cached is not user
+
+
+@pytest.mark.django_db
+def test_cached_jwt_auth_invalidation(auth_user, django_assert_num_queries):
+    authenticate(auth_user)
+
+    auth_user.first_name = 'changed'
+    auth_user.save()
+
+    with django_assert_num_queries(1):
+        user = authenticate(auth_user)
+
+    assert user.first_name == 'changed'
+
+
+@pytest.mark.django_db
+def test_cached_jwt_auth_inactive(auth_user):
+    authenticate(auth_user)
+
+    auth_user.is_active = False
+    auth_user.save()
+
+    with pytest.raises(AuthenticationFailed):
+        authenticate(auth_user)
+
+
+@pytest.mark.django_db
+def test_user_cache_returns_copies(auth_user):
+    user_cache.set(auth_user)
+    user = user_cache.get(auth_user.pk)
+    user.first_name = 'mutated'
+
+    assert user_cache.get(auth_user.pk).first_name != 'mutated'
+
+
+@pytest.mark.django_db
+def test_async_cached_jwt_auth(auth_user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        user = aauthenticate(auth_user)
+
+    assert user == auth_user
+
+    with django_assert_num_queries(0):
+        assert authenticate(auth_user) == auth_user
+
+    auth_user.is_active = False
+    auth_user.save()
+
+    with pytest.raises(AuthenticationFailed):
+        aauthenticate(auth_user)
+
+
+@pytest.mark.django_db
+def test_user_cache_disabled(auth_user, settings):
+    settings.AUTH_USER_CACHE = {**settings.AUTH_USER_CACHE, 'CACHE_ALIAS': None}
+    cache = UserCache()
+    cache.set(auth_user)
+
+    assert cache.get(auth_user.pk) is None
+
@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import pytest
+from PIL import Image
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from accounts.avatars import process_batch, save_avatar
+from accounts.factory import UserFactory
+from accounts.models import AvatarJob
+from core.models import Blob, UploadSession
+from core.testing import checksum, create_image, send_chunk
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+def upload(client, file):
+    return client.request('post', reverse('api:avatar'), payload={'file': file})
+
+
+@pytest.mark.django_db
+def test_avatar_is_normalized_in_background(logged_in, settings):
+    settings.AVATARS = {**settings.AVATARS, 'MAX_DIMENSION': 64, 'VARIANT_SIZES': (16, 48)}
+    image = create_image(size=(200, 100))
+
+    response = upload(logged_in.client, SimpleUploadedFile('image.png', image.getvalue(), 'image/png'))
+
+    assert response.status_code == 200
+    logged_in.user.refresh_from_db()
+    job = AvatarJob.objects.get(user=logged_in.user)
+    assert job.source == logged_in.user.avatar.name
+    storage = logged_in.user.avatar.storage
+
+    out = StringIO()
+    call_command('process_avatars', once=True, workers=1, stdout=out)
+
+    assert 'done: 1, skipped: 0, failed: 0' in out.getvalue()
+    logged_in.user.refresh_from_db()
+    assert logged_in.user.avatar.name.endswith('.jpg')
+    with Image.open(logged_in.user.avatar) as avatar:
+        assert avatar.size == (64, 32)
+    assert Blob.objects.get(name=job.source).references == 0
+
+    job.refresh_from_db()
+    assert job.status == AvatarJob.Status.DONE
+
+    variants = logged_in.user.avatar_variants
+    assert set(variants) == {'16', '48'}
+    assert set(variants['16']) == {'webp', 'jpg'}
+    with storage.open(variants['48']['webp']) as file, Image.open(file) as thumbnail:
+        # not upscaled past the normalized avatar
+        assert (thumbnail.format, thumbnail.size) == ('WEBP', (32, 32))
+
+    response = logged_in.client.request('get', reverse('api:user_profile'))
+
+    data = response.json()
+    assert data['avatar'] == logged_in.user.avatar.url
+    assert data['avatar_variants']['16']['webp'] == storage.url(variants['16']['webp'])
+
+    response = logged_in.client.request(
+        'get',
+        reverse('api:get_user_profile', kwargs={'user_id': logged_in.user.id}),
+        payload={'fields': 'avatar,avatar_variants'},
+    )
+
+    assert response.json() == {'avatar': data['avatar'], 'avatar_variants': data['avatar_variants']}
+
+
+@pytest.mark.django_db
+def test_avatar_job_superseded(auth_user, executor, settings):
+    first = save_avatar(auth_user, SimpleUploadedFile('first.png', create_image(size=(10, 10)).getvalue()), 'PNG')
+    second = save_avatar(auth_user, SimpleUploadedFile('second.png', create_image(size=(20, 20)).getvalue()), 'PNG')
+
+    assert process_batch(executor, 10) == {'done': 1, 'skipped': 1, 'failed': 0}
+
+    auth_user.refresh_from_db()
+    assert auth_user.avatar.name != second.source
+    assert len(auth_user.avatar_variants) == len(settings.AVATARS['VARIANT_SIZES'])
+    assert Blob.objects.get(name=first.source).references == 0
+
+
+@pytest.mark.django_db
+def test_identical_avatars_are_stored_once(auth_user, executor):
+    other = UserFactory()
+    # larger than the thumbnails so none of them is the avatar itself
+    image = create_image((600, 600)).getvalue()
+
+    save_avatar(auth_user, SimpleUploadedFile('avatar.png', image), 'PNG')
+    save_avatar(other, SimpleUploadedFile('copy.png', image), 'PNG')
+    process_batch(executor, 10)
+
+    auth_user.refresh_from_db()
+    other.refresh_from_db()
+    assert auth_user.avatar.name == other.avatar.name
+    assert auth_user.avatar_variants == other.avatar_variants
+    assert Blob.objects.get(name=auth_user.avatar.name).references == 2
+
+    other.delete()
+
+    assert Blob.objects.get(name=auth_user.avatar.name).references == 1
+
+
+@pytest.mark.django_db
+def test_avatar_job_invalid_image(auth_user, executor):
+    job = save_avatar(auth_user, SimpleUploadedFile('broken.png', b'not an image'), 'PNG')
+
+    assert process_batch(executor, 10) == {'done': 0, 'skipped': 0, 'failed': 1}
+
+    job.refresh_from_db()
+    assert job.status == AvatarJob.Status.FAILED
+    assert 'InvalidImage' in job.last_error
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data, content_type, error', [
+    (b'not an image', 'image/png', 'image'),
+    (create_image(image_format='GIF').getvalue(), 'image/png', 'image'),
+    (create_image(size=(300, 300)).getvalue(), 'image/png', 'image'),
+    (create_image().getvalue(), 'image/gif', 'content_type'),
+])
+def test_avatar_rejected(logged_in, settings, data, content_type, error):
+    settings.AVATARS = {**settings.AVATARS, 'MAX_PIXELS': 200 * 200}
+
+    response = upload(logged_in.client, SimpleUploadedFile('image.png', data, content_type))
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == error
+    assert not AvatarJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_upload_too_large(logged_in, settings):
+    settings.UPLOADS = {**settings.UPLOADS, 'MAX_FILE_SIZE': 1024}
+
+    response = upload(logged_in.client, SimpleUploadedFile('image.png', b'\0' * 4096, 'image/png'))
+
+    assert response.status_code == 413
+
+
+@pytest.mark.django_db
+def test_resumable_avatar_upload(logged_in):
+    data = create_image(size=(300, 300)).getvalue()
+    first, rest = data[:100], data[100:]
+
+    response = logged_in.client.request(
+        'post', reverse('api:create_avatar_upload'), payload={'size': len(data), 'checksum': checksum(data)},
+        content_type='application/json',
+    )
+    assert response.status_code == 201
+    upload_id = response.json()['id']
+
+    response = send_chunk(logged_in.client, upload_id, 0, first, **{'Upload-Checksum': checksum(first, 'sha1')})
+    assert response.status_code == 200
+    assert response['Upload-Offset'] == '100'
+
+    # a retried chunk the server already has
+    response = send_chunk(logged_in.client, upload_id, 0, first)
+    assert response.status_code == 409
+    assert response.json()['offset'] == 100
+
+    response = send_chunk(logged_in.client, upload_id, 100, rest, **{'Upload-Checksum': checksum(b'corrupted')})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == 'chunk checksum mismatch'
+
+    response = logged_in.client.request('get', reverse('api:avatar_upload', kwargs={'upload_id': upload_id}))
+    assert response.json()['offset'] == 100
+
+    finalize_url = reverse('api:finalize_avatar_upload', kwargs={'upload_id': upload_id})
+    response = logged_in.client.request('post', finalize_url)
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == f'upload is incomplete: 100 of {len(data)} bytes'
+
+    response = send_chunk(logged_in.client, upload_id, 100, rest, **{'Upload-Checksum': checksum(rest)})
+    assert response.status_code == 200
+    assert response.json()['offset'] == len(data)
+
+    response = logged_in.client.request('post', finalize_url)
+
+    assert response.status_code == 200
+    logged_in.user.refresh_from_db()
+    assert response.json()['avatar'].endswith(logged_in.user.avatar.name)
+    with logged_in.user.avatar.open() as file:
+        assert file.read() == data
+    assert AvatarJob.objects.filter(user=logged_in.user, source=logged_in.user.avatar.name).exists()
+    assert not UploadSession.objects.exists()
+
+
+@pytest.mark.django_db
+def test_resumable_avatar_upload_rejected(logged_in, settings):
+    settings.AVATARS = {**settings.AVATARS, 'MAX_SIZE': 100}
+    url = reverse('api:create_avatar_upload')
+
+    response = logged_in.client.request('post', url, payload={'size': 101}, content_type='application/json')
+    assert response.status_code == 422
+
+    response = logged_in.client.request('post', url, payload={'size': 10}, content_type='application/json')
+    upload_id = response.json()['id']
+
+    response = send_chunk(logged_in.client, upload_id, 0, b'x' * 11)
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == 'chunk exceeds the upload size of 10 bytes'
+
+    send_chunk(logged_in.client, upload_id, 0, b'x' * 10)
+    response = logged_in.client.request('post', reverse('api:finalize_avatar_upload', kwargs={'upload_id': upload_id}))
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'image'
+
+    other = UserFactory()
+    session = UploadSession.objects.get(pk=upload_id)
+    session.user = other
+    session.save()
+
+    response = send_chunk(logged_in.client, upload_id, 10, b'x')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_regenerate_avatar_variants(auth_user, settings, executor):
+    save_avatar(auth_user, SimpleUploadedFile('avatar.png', create_image().getvalue()), 'PNG')
+    process_batch(executor, 10)
+    auth_user.refresh_from_db()
+    previous = auth_user.avatar_variants
+    settings.AVATARS = {**settings.AVATARS, 'VARIANT_SIZES': (32,), 'VARIANT_FORMATS': ('WEBP',)}
+
+    out = StringIO()
+    call_command('regenerate_avatar_variants', workers=1, stdout=out)
+
+    assert 'done: 1, skipped: 0, failed: 0' in out.getvalue()
+    auth_user.refresh_from_db()
+    assert set(auth_user.avatar_variants) == {'32'}
+    assert set(auth_user.avatar_variants['32']) == {'webp'}
+    assert not Blob.objects.filter(name__in=previous['64'].values(), references__gt=0).exists()
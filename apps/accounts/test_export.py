@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse
+
+from accounts.factory import UserFactory
+from core.testing import read_stream
+
+
+@pytest.mark.django_db
+def test_export_accounts(logged_in):
+    url = reverse('api:export_accounts')
+    users = UserFactory.create_batch(size=3, is_superuser=False)
+
+    response = logged_in.client.request('get', url)
+
+    assert response.status_code == 401
+
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+
+    response = logged_in.client.request('get', url)
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in read_stream(response).splitlines()]
+    assert rows == [
+        {'id': u.id, 'email': u.email, 'first_name': u.first_name, 'last_name': u.last_name} for u in users
+    ]
+
+    response = logged_in.client.request(
+        'get', url, payload={'format': 'csv', 'fields': 'id,email', 'email': users[1].email, 'email_match': 'exact'},
+    )
+
+    assert response.status_code == 200
+    assert response['Content-Disposition'] == 'attachment; filename="users.csv"'
+    assert list(csv.reader(io.StringIO(read_stream(response)))) == [['id', 'email'], [str(users[1].id), users[1].email]]
+
+
+@pytest.mark.django_db
+def test_export_accounts_streams_for_the_handler(logged_in, async_client):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    users = UserFactory.create_batch(size=3, is_superuser=False)
+    url = reverse('api:export_accounts')
+
+    response = logged_in.client.request('get', url, payload={'fields': 'id'})
+
+    # WSGI iterates synchronously, an async iterator would be buffered
+    assert not response.is_async
+    assert [json.loads(line) for line in read_stream(response).splitlines()] == [{'id': u.id} for u in users]
+
+    response = async_to_sync(async_client.get)(
+        url, {'fields': 'id'}, headers={'Authorization': f'Bearer {logged_in.client.bearer}'},
+    )
+
+    assert response.is_async
+    assert [json.loads(line) for line in read_stream(response).splitlines()] == [{'id': u.id} for u in users]
+
+
+@pytest.mark.django_db
+def test_export_users_command(tmp_path):
+    users = UserFactory.create_batch(size=5, is_superuser=False)
+    output = tmp_path / 'users.csv'
+
+    call_command('export_users', format='csv', fields='email', chunk_size=2, output=str(output))
+
+    assert output.read_text().splitlines() == ['email', *[u.email for u in users]]
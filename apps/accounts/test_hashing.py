@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.hashers import make_password as django_make_password
+from django.urls import reverse
+
+from .hashing import HashingExecutor, HashingSaturated, acheck_user_password, aset_user_password, hashing_executor
+
+
+def test_hashing_executor_backpressure():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    running = executor.submit(release.wait)
+    pending = executor.submit(release.wait)
+    with pytest.raises(HashingSaturated):
+        executor.submit(release.wait)
+
+    release.set()
+    assert running.result() and pending.result()
+    assert executor.submit(sum, [1, 2]).result() == 3
+
+
+@pytest.mark.django_db
+def test_acheck_user_password_upgrades_hash(auth_user, settings):
+    settings.PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+    auth_user.password = django_make_password('password', hasher='md5')
+    auth_user.save()
+
+    assert not async_to_sync(acheck_user_password)(auth_user, 'wrong')
+    assert async_to_sync(acheck_user_password)(auth_user, 'password')
+
+    auth_user.refresh_from_db()
+    assert auth_user.password.startswith('pbkdf2_sha256$')
+
+    async_to_sync(aset_user_password)(auth_user, 'changed')
+    assert auth_user.check_password('changed')
+
+
+@pytest.mark.django_db
+def test_auth_pair(api_client, auth_user):
+    url = reverse('api:auth_pair')
+
+    response = api_client.request(
+        'post', url, payload={'email': auth_user.email, 'password': 'password'}, content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['access'] and data['refresh']
+    assert data['user']['email'] == auth_user.email
+
+    response = api_client.request(
+        'post', url, payload={'email': auth_user.email, 'password': 'wrong'}, content_type='application/json'
+    )
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['type'] == 'invalid_credentials'
+
+
+@pytest.mark.django_db
+def test_auth_pair_saturated(api_client, auth_user, monkeypatch):
+    def saturated(*args):
+        raise HashingSaturated()
+
+    monkeypatch.setattr(hashing_executor, 'submit', saturated)
+
+    response = api_client.request(
+        'post',
+        reverse('api:auth_pair'),
+        payload={'email': auth_user.email, 'password': 'password'},
+        content_type='application/json',
+    )
+
+    assert response.status_code == 503
+    assert response['Retry-After'] == '1'
@@ -0,0 +1,95 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+
+from accounts.export import ExportFormat
+from accounts.factory import UserFactory
+from accounts.importing import UserImporter, read_rows
+from accounts.models import User
+
+
+@pytest.mark.django_db
+def test_import_users_csv(tmp_path):
+    existing = UserFactory()
+    path = tmp_path / 'users.csv'
+    path.write_text('\n'.join([
+        'email,password,first_name,last_name',
+        'first@Example.com,secret,First,User',
+        'not-an-email,secret,,',
+        f'{existing.email},secret,,',
+        'second@example.com,secret,Second,',
+        'first@example.com,other,,',
+    ]))
+
+    out, err = StringIO(), StringIO()
+    call_command('import_users', str(path), batch_size=3, workers=2, stdout=out, stderr=err)
+
+    assert 'rows: 5, created: 2, invalid: 1, duplicate: 2' in out.getvalue()
+    assert 'line 3: email:' in err.getvalue()
+    assert f'line 4: email {existing.email} is already used' in err.getvalue()
+    assert 'line 6: email first@example.com is already used' in err.getvalue()
+
+    first = User.objects.get(email='first@example.com')
+    assert first.first_name == 'First'
+    assert first.check_password('secret')
+    assert User.objects.filter(email='second@example.com').exists()
+
+
+@pytest.mark.django_db
+def test_import_users_ndjson_prehashed(tmp_path):
+    path = tmp_path / 'users.ndjson'
+    path.write_text('\n'.join([
+        json.dumps({'email': 'hashed@example.com', 'password': make_password('secret')}),
+        json.dumps({'email': 'plain@example.com', 'password': 'secret'}),
+    ]))
+
+    out, err = StringIO(), StringIO()
+    call_command('import_users', str(path), prehashed=True, workers=1, stdout=out, stderr=err)
+
+    assert 'rows: 2, created: 1, invalid: 1' in out.getvalue()
+    assert 'line 2: password: not a known password hash' in err.getvalue()
+    assert User.objects.get(email='hashed@example.com').check_password('secret')
+
+
+@pytest.mark.django_db
+def test_import_users_ndjson_malformed_line(tmp_path):
+    path = tmp_path / 'users.ndjson'
+    path.write_text('\n'.join([
+        json.dumps({'email': 'first@example.com', 'password': 'secret'}),
+        '{"email": "broken@example.com", ',
+        json.dumps({'email': 'second@example.com', 'password': 'secret'}),
+    ]))
+
+    out, err = StringIO(), StringIO()
+    call_command('import_users', str(path), workers=1, stdout=out, stderr=err)
+
+    assert 'rows: 3, created: 2, invalid: 1' in out.getvalue()
+    assert 'line 2: row: not valid JSON' in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_users_concurrent_signup(monkeypatch):
+    rows = read_rows(StringIO('email,password\ntaken@example.com,secret\nfree@example.com,secret\n'), ExportFormat.CSV)
+    drop_existing = UserImporter.drop_existing
+    calls = []
+
+    def signup_after_check(importer, payloads):
+        # the first check runs before the concurrent signup commits
+        calls.append(payloads)
+        if len(calls) == 1:
+            UserFactory(email='taken@example.com')
+            return set()
+        return drop_existing(importer, payloads)
+
+    monkeypatch.setattr(UserImporter, 'drop_existing', signup_after_check)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        importer = UserImporter(executor)
+        list(importer.import_rows(rows))
+
+    assert importer.stats['created'] == 1
+    assert importer.errors == [(2, 'email taken@example.com is already used')]
+    assert User.objects.filter(email='free@example.com').exists()
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from accounts.factory import UserFactory
+from accounts.models import UserToken
+
+
+@pytest.mark.django_db
+def test_user_token_stored_hashed():
+    user = UserFactory()
+    token = UserToken.objects.issue(user, UserToken.Purpose.RESET_PASSWORD)
+
+    stored = UserToken.objects.get()
+    assert stored.digest != token
+    assert stored.digest == UserToken.make_digest(token)
+    assert UserToken.objects.valid(token, UserToken.Purpose.RESET_PASSWORD).get() == stored
+    assert not UserToken.objects.valid(token, UserToken.Purpose.EMAIL_CONFIRMATION).exists()
+
+    # reissuing replaces the previous token
+    new_token = UserToken.objects.issue(user, UserToken.Purpose.RESET_PASSWORD)
+    assert not UserToken.objects.valid(token, UserToken.Purpose.RESET_PASSWORD).exists()
+    assert UserToken.objects.valid(new_token, UserToken.Purpose.RESET_PASSWORD).exists()
+
+
+@pytest.mark.django_db
+def test_clear_expired_tokens():
+    user = UserFactory()
+    UserToken.objects.issue(user, UserToken.Purpose.RESET_PASSWORD)
+    UserToken.objects.issue(user, UserToken.Purpose.EMAIL_CONFIRMATION)
+    UserToken.objects.filter(purpose=UserToken.Purpose.RESET_PASSWORD).update(
+        expires_at=timezone.now() - timedelta(minutes=1),
+    )
+
+    out = StringIO()
+    call_command('clear_expired_tokens', batch_size=1, stdout=out)
+
+    assert '1 expired token(s) deleted' in out.getvalue()
+    assert list(UserToken.objects.values_list('purpose', flat=True)) == [UserToken.Purpose.EMAIL_CONFIRMATION]
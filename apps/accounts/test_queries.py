@@ -0,0 +1,246 @@
+from io import BytesIO
+
+import pytest
+from django.urls import reverse
+from ninja_jwt.tokens import RefreshToken
+
+from accounts.api import accounts_router
+from accounts.factory import UserFactory
+from accounts.models import UserToken
+from core.testing import create_image, read_stream, send_chunk
+from core.uploads import append_chunk, create_session
+
+# Maximum queries per call of every accounts route, authentication with
+# a cold user cache and transaction savepoints included. Raise a budget
+# only together with the change that needs the extra query.
+BUDGETS = {
+    'signup': 6,
+    'auth_pair': 1,
+    'auth_pair_other': 2,
+    'auth_refresh': 0,
+    'forgot_password': 5,
+    'reset_password': 3,
+    'verify_email': 1,
+    'resend_verify_email': 5,
+    'change_password': 2,
+    'user_profile': 1,
+    # + blob reference upsert, + locking the previous avatar to release it
+    'avatar': 7,
+    'create_avatar_upload': 2,
+    'avatar_upload': 2,
+    'avatar_upload_chunk': 6,
+    'finalize_avatar_upload': 9,
+    'delete_avatar_upload': 3,
+    'get_user_profile': 3,
+    'get_accounts': 2,
+    'export_accounts': 2,
+}
+
+
+def test_every_route_has_a_budget():
+    operations = {
+        operation.view_func.__name__
+        for path_view in accounts_router.path_operations.values()
+        for operation in path_view.operations
+    }
+    assert operations == set(BUDGETS)
+
+
+def post_json(client, url_name, payload, bearer=None):
+    headers = {'Authorization': f'Bearer {bearer}'} if bearer else {}
+    return client.post(reverse(f'api:{url_name}'), payload, content_type='application/json', headers=headers)
+
+
+@pytest.mark.django_db
+def test_signup_queries(client, query_budget):
+    with query_budget(BUDGETS['signup']):
+        response = post_json(client, 'signup', {'email': 'new@example.com', 'password': 'password'})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_auth_pair_queries(client, auth_user, query_budget):
+    with query_budget(BUDGETS['auth_pair']):
+        response = post_json(client, 'auth_pair', {'email': auth_user.email, 'password': 'password'})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_auth_pair_other_queries(client, logged_in, query_budget):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    other = UserFactory()
+
+    with query_budget(BUDGETS['auth_pair_other']):
+        response = post_json(client, 'auth_pair_other', {'user_id': other.id}, bearer=logged_in.client.bearer)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_auth_refresh_queries(client, auth_user, query_budget):
+    refresh = str(RefreshToken.for_user(auth_user))
+
+    with query_budget(BUDGETS['auth_refresh']):
+        response = post_json(client, 'auth_refresh', {'refresh': refresh})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_forgot_password_queries(client, auth_user, query_budget):
+    with query_budget(BUDGETS['forgot_password']):
+        response = post_json(client, 'forgot_password', {'email': auth_user.email})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_reset_password_queries(client, auth_user, query_budget):
+    token = UserToken.objects.issue(auth_user, UserToken.Purpose.RESET_PASSWORD)
+
+    with query_budget(BUDGETS['reset_password']):
+        response = post_json(client, 'reset_password', {'token': token, 'password': 'new-password'})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_verify_email_queries(client, auth_user, query_budget):
+    token = UserToken.objects.issue(auth_user, UserToken.Purpose.EMAIL_CONFIRMATION)
+
+    with query_budget(BUDGETS['verify_email']):
+        response = post_json(client, 'verify_email', {'token': token})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_resend_verify_email_queries(client, logged_in, query_budget):
+    with query_budget(BUDGETS['resend_verify_email']):
+        response = post_json(client, 'resend_verify_email', {}, bearer=logged_in.client.bearer)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_change_password_queries(logged_in, query_budget):
+    payload = {'old_password': 'password', 'password': 'changed', 'password_confirmation': 'changed'}
+
+    with query_budget(BUDGETS['change_password']):
+        response = logged_in.client.request(
+            'put', reverse('api:change_password'), payload=payload, content_type='application/json',
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_user_profile_queries(logged_in, query_budget):
+    with query_budget(BUDGETS['user_profile']):
+        response = logged_in.client.request('get', reverse('api:user_profile'))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_avatar_queries(logged_in, image_file, query_budget):
+    with query_budget(BUDGETS['avatar']):
+        response = logged_in.client.request('post', reverse('api:avatar'), payload={'file': image_file()})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_create_avatar_upload_queries(logged_in, query_budget):
+    with query_budget(BUDGETS['create_avatar_upload']):
+        response = logged_in.client.request(
+            'post', reverse('api:create_avatar_upload'), payload={'size': 100}, content_type='application/json',
+        )
+
+    assert response.status_code == 201
+
+
+@pytest.mark.django_db
+def test_avatar_upload_queries(logged_in, query_budget):
+    session = create_session(logged_in.user, 100)
+
+    with query_budget(BUDGETS['avatar_upload']):
+        response = logged_in.client.request('get', reverse('api:avatar_upload', kwargs={'upload_id': session.id}))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_avatar_upload_chunk_queries(logged_in, query_budget):
+    session = create_session(logged_in.user, 100)
+
+    with query_budget(BUDGETS['avatar_upload_chunk']):
+        response = send_chunk(logged_in.client, session.id, 0, b'x' * 50)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_finalize_avatar_upload_queries(logged_in, query_budget):
+    data = create_image().getvalue()
+    session = create_session(logged_in.user, len(data))
+    append_chunk(session, 0, BytesIO(data), len(data))
+
+    with query_budget(BUDGETS['finalize_avatar_upload']):
+        response = logged_in.client.request(
+            'post', reverse('api:finalize_avatar_upload', kwargs={'upload_id': session.id}),
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_delete_avatar_upload_queries(logged_in, query_budget):
+    session = create_session(logged_in.user, 100)
+
+    with query_budget(BUDGETS['delete_avatar_upload']):
+        response = logged_in.client.request(
+            'delete', reverse('api:delete_avatar_upload', kwargs={'upload_id': session.id}),
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_get_user_profile_queries(logged_in, query_budget):
+    other = UserFactory()
+
+    with query_budget(BUDGETS['get_user_profile']):
+        response = logged_in.client.request('get', reverse('api:get_user_profile', kwargs={'user_id': other.id}))
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_get_accounts_queries(logged_in, query_budget):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    UserFactory.create_batch(size=25)
+
+    with query_budget(BUDGETS['get_accounts']):
+        response = logged_in.client.request('get', reverse('api:get_accounts'), payload={'limit': 20})
+
+    assert response.status_code == 200
+    assert len(response.json()['items']) == 20
+
+
+@pytest.mark.django_db
+def test_export_accounts_queries(logged_in, query_budget):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    UserFactory.create_batch(size=25)
+
+    with query_budget(BUDGETS['export_accounts']):
+        response = logged_in.client.request('get', reverse('api:export_accounts'))
+        lines = read_stream(response).splitlines()
+
+    assert response.status_code == 200
+    assert len(lines) == 25
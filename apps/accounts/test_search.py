@@ -0,0 +1,42 @@
+import pytest
+from django.urls import reverse
+
+from accounts.factory import UserFactory
+from accounts.models import User
+from .search import EmailMatch, search_email
+
+
+@pytest.mark.django_db
+def test_search_email():
+    john = UserFactory(email='John.Doe@example.com')
+    jane = UserFactory(email='jane@doe.com')
+
+    def search(term, match):
+        return set(search_email(User.objects.all(), term, match))
+
+    assert search('john.doe@EXAMPLE.com', EmailMatch.EXACT) == {john}
+    assert search('john', EmailMatch.EXACT) == set()
+
+    assert search('JOHN', EmailMatch.PREFIX) == {john}
+    assert search('doe', EmailMatch.PREFIX) == set()
+
+    assert search('DOE', EmailMatch.CONTAINS) == {john, jane}
+    assert search('100%', EmailMatch.CONTAINS) == set()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('term, expected', [
+    ('john.smith@smith.org', {'john.smith@smith.org'}),
+    ('@smith.org', {'john.smith@smith.org', 'smith@smith.org'}),
+    ('smith@', {'john.smith@smith.org', 'smith@smith.org', 'smith@doe.net'}),
+    ('SMITH@SMITH', {'john.smith@smith.org', 'smith@smith.org'}),
+    ('Smith', {'john.smith@smith.org', 'smith@smith.org', 'smith@doe.net'}),
+])
+def test_admin_search_email(admin_client, term, expected):
+    for email in ('john.smith@smith.org', 'smith@smith.org', 'smith@doe.net'):
+        UserFactory(email=email, last_name='Doe', first_name='Jane')
+
+    response = admin_client.get(reverse('admin:accounts_user_changelist'), {'q': term})
+
+    assert response.status_code == 200
+    assert {user.email for user in response.context['cl'].result_list} == expected
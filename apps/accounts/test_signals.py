@@ -0,0 +1,61 @@
+import pytest
+
+from accounts.models import User
+from .authentication import user_cache
+from .signals import user_created, user_creating
+
+
+@pytest.fixture
+def hooks():
+    calls = []
+
+    def creating(sender, user, **kwargs):
+        user.first_name = 'Set before insert'
+        calls.append('creating')
+
+    def created(sender, user, **kwargs):
+        calls.append('created')
+
+    user_creating.connect(creating)
+    user_created.connect(created)
+    yield calls
+    user_creating.disconnect(creating)
+    user_created.disconnect(created)
+
+
+@pytest.mark.django_db
+def test_create_user_single_write(hooks, django_assert_num_queries, django_capture_on_commit_callbacks):
+    with (
+        django_capture_on_commit_callbacks(execute=True) as callbacks,
+        django_assert_num_queries(1),
+    ):
+        user = User.objects.create_user(email='new@example.com', password='password')
+
+    # `user_created` and the user cache invalidation
+    assert len(callbacks) == 2
+    assert hooks == ['creating', 'created']
+    assert User.objects.get(pk=user.pk).first_name == 'Set before insert'
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user.save()
+
+    assert len(callbacks) == 1
+    assert hooks == ['creating', 'created']
+
+
+@pytest.mark.django_db
+def test_user_cache_invalidated_on_commit(auth_user, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_user.first_name = 'changed'
+        auth_user.save()
+        # a concurrent request caching the row before the commit
+        user_cache.set(User.objects.get(pk=auth_user.pk))
+
+    assert user_cache.get(auth_user.pk) is None
+
+    user = User.objects.get(pk=auth_user.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_user.delete()
+        user_cache.set(user)
+
+    assert user_cache.get(user.pk) is None
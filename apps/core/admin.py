@@ -0,0 +1,17 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    ordering = ('-id',)
+    actions = ('requeue',)
+
+    @admin.action(description='Requeue selected emails')
+    def requeue(self, request, queryset):
+        queryset.update(status=OutgoingEmail.Status.PENDING, attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from django.db import connections
+from ninja import Router
+from ninja.errors import HttpError
+
+from core.db import database_stats
+from core.schemas import DatabaseStatsResponse
+
+__all__ = (
+    'core_router',
+)
+
+core_router = Router(tags=['Core'])
+
+
+@core_router.get(
+    'db/',
+    response={200: list[DatabaseStatsResponse]},
+    description='''Connection reuse and pool statistics of every database.
+    Superusers only.''',
+    url_name='database_stats',
+)
+async def get_database_stats(request):
+    if not request.auth.is_superuser:
+        raise HttpError(401, 'Unauthorized')
+
+    # connections are per thread, read them where the ORM runs
+    return 200, await sync_to_async(lambda: [database_stats(alias) for alias in connections])()
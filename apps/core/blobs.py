@@ -0,0 +1,169 @@
+import hashlib
+import posixpath
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Blob
+from core.utils import batched
+
+__all__ = (
+    'collect_garbage',
+    'collect_orphans',
+    'get_blob_name',
+    'is_blob',
+    'release_blobs',
+    'store_blob',
+    'store_blobs',
+)
+
+DIGEST_SIZE = 20
+
+
+def hash_file(file: File) -> str:
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def get_blob_name(digest: str, extension: str) -> str:
+    """
+    `<ROOT>/ab/cd/abcd….<extension>`, sharded by the leading digits
+    so no directory grows too large.
+    """
+    options = settings.BLOBS
+    shards = [digest[i * 2:i * 2 + 2] for i in range(options['SHARD_DEPTH'])]
+    return posixpath.join(options['ROOT'], *shards, f'{digest}.{extension}')
+
+
+def is_blob(name: str) -> bool:
+    return name.startswith(settings.BLOBS['ROOT'] + '/')
+
+
+def acquire_blobs(references: Counter, sizes: dict[str, int], using: str):
+    """
+    Add `references` to the blob rows, creating the missing ones, in one
+    upsert. Conflicting rows stay locked until the transaction ends.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(Blob._meta.db_table)
+    name, size, count, created_at, released_at = map(quote, ('name', 'size', 'references', 'created_at', 'released_at'))
+    now = Blob._meta.get_field('created_at').get_db_prep_value(timezone.now(), connection)
+
+    values = ', '.join(['(%s, %s, %s, %s)'] * len(references))
+    params = [value for blob, added in references.items() for value in (blob, sizes[blob], added, now)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({name}, {size}, {count}, {created_at}) VALUES {values} '
+            f'ON CONFLICT ({name}) DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}, {released_at} = NULL',
+            params,
+        )
+
+
+def store_blobs(files: Iterable[tuple[File, str]]) -> list[str]:
+    """
+    Store each `(file, extension)` under the hash of its content and take
+    a reference to it, counted for all files in a single query. Identical
+    content is written once, later stores only count another reference.
+    Returns the storage names in order.
+    """
+    files = [(file, get_blob_name(hash_file(file), extension)) for file, extension in files]
+    if not files:
+        return []
+
+    using = router.db_for_write(Blob)
+    with transaction.atomic(using=using, savepoint=False):
+        # the row locks keep `collect_garbage` off the files until committed
+        acquire_blobs(Counter(name for _, name in files), {name: file.size for file, name in files}, using)
+
+        written = set()
+        for file, name in files:
+            if name not in written and not default_storage.exists(name):
+                saved = default_storage.save(name, file)
+                if saved != name:
+                    # written concurrently with the same content
+                    default_storage.delete(saved)
+            written.add(name)
+
+    return [name for _, name in files]
+
+
+def store_blob(file: File, extension: str) -> str:
+    return store_blobs([(file, extension)])[0]
+
+
+def release_blobs(names: Iterable[str]):
+    """
+    Drop a reference to each of `names`. Names outside the blob
+    storage, e.g. files stored before it existed, are ignored.
+    """
+    names = [name for name in names if name and is_blob(name)]
+    if not names:
+        return
+
+    with transaction.atomic():
+        Blob.objects.filter(name__in=names, references__gt=0).update(references=F('references') - 1)
+        Blob.objects.filter(name__in=names, references=0, released_at=None).update(released_at=timezone.now())
+
+
+def collect_garbage(grace: int, batch_size: int = 500) -> int:
+    """
+    Delete files unreferenced for more than `grace` seconds.
+    Returns how many were deleted.
+    """
+    deleted = 0
+    threshold = timezone.now() - timedelta(seconds=grace)
+    while True:
+        with transaction.atomic():
+            blobs = list(
+                Blob.objects
+                .select_for_update(skip_locked=True)
+                .filter(references=0, released_at__lt=threshold)
+                .order_by('released_at')[:batch_size]
+            )
+            for blob in blobs:
+                default_storage.delete(blob.name)
+            Blob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+
+        deleted += len(blobs)
+        if len(blobs) < batch_size:
+            return deleted
+
+
+def walk_files(directory: str) -> Iterator[str]:
+    try:
+        directories, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield posixpath.join(directory, name)
+    for subdirectory in directories:
+        yield from walk_files(posixpath.join(directory, subdirectory))
+
+
+def collect_orphans(grace: int) -> int:
+    """
+    Delete files in the blob storage without a `Blob` row, left by
+    interrupted stores, once older than `grace` seconds.
+    """
+    deleted = 0
+    threshold = timezone.now() - timedelta(seconds=grace)
+    for names in batched(walk_files(settings.BLOBS['ROOT']), 500):
+        known = set(Blob.objects.filter(name__in=names).values_list('name', flat=True))
+        for name in names:
+            if name not in known and default_storage.get_modified_time(name) < threshold:
+                default_storage.delete(name)
+                deleted += 1
+    return deleted
+
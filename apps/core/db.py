@@ -0,0 +1,22 @@
+from django.db import connections
+
+__all__ = (
+    'database_stats',
+)
+
+
+def database_stats(alias: str = 'default') -> dict:
+    """
+    Connection reuse settings of `alias` and, when it is pooled,
+    the psycopg pool counters (size, available, waiting, errors...).
+    """
+    connection = connections[alias]
+    pool = getattr(connection, 'pool', None)
+    return {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'pooled': pool is not None,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'conn_health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        'pool': pool.get_stats() if pool is not None else {},
+    }
@@ -1,9 +1,13 @@
+import smtplib
+import time
+
 from django.conf import settings
 from django.template import loader
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 
 
 __all__ = (
+    "BatchSender",
     "send_email",
 )
 
@@ -34,7 +38,10 @@ def send_email(
 
     body = render_body(template_name, context)
 
-    send_sync_email(
+    from core.email.outbox import enqueue_email
+
+    send = enqueue_email if settings.EMAIL_OUTBOX['ENABLED'] else send_sync_email
+    send(
         subject=subject,
         body=body,
         to=to if isinstance(to, list) else [to],
@@ -44,14 +51,14 @@ def send_email(
     )
 
 
-def send_sync_email(
+def build_message(
         subject: str,
         body: str,
         to: list[str],
         bcc: list[str] | None = None,
         cc: list[str] | None = None,
         reply_to: list[str] | None = None,
-):
+) -> EmailMessage:
     email = EmailMessage(
         subject=subject,
         body=body,
@@ -64,4 +71,89 @@ def send_sync_email(
     # Setting main content
     email.content_subtype = 'html'
 
-    email.send()
+    return email
+
+
+def send_sync_email(
+        subject: str,
+        body: str,
+        to: list[str],
+        bcc: list[str] | None = None,
+        cc: list[str] | None = None,
+        reply_to: list[str] | None = None,
+):
+    build_message(subject, body, to, bcc=bcc, cc=cc, reply_to=reply_to).send()
+
+
+class BatchSender:
+    """
+    Sends batches of messages over one long-lived connection of the
+    configured email backend instead of connecting per message.
+
+    A dropped connection is reopened and the message retried once,
+    results are reported per message so callers know exactly what
+    was delivered. Not thread-safe, use one sender per thread.
+    """
+
+    reconnect_errors = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+    def __init__(self, backend: str | None = None):
+        self.backend = backend
+        self.connection = None
+        self.stats = {'sent': 0, 'failed': 0, 'batches': 0, 'connections': 0, 'seconds': 0.0}
+
+    @property
+    def throughput(self) -> float:
+        """
+        Delivered messages per second spent sending.
+        """
+        if not self.stats['seconds']:
+            return 0.0
+        return self.stats['sent'] / self.stats['seconds']
+
+    def open(self):
+        if self.connection is None:
+            connection = get_connection(self.backend, fail_silently=False)
+            connection.open()
+            self.connection = connection
+            self.stats['connections'] += 1
+        return self.connection
+
+    def close(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass  # the connection is gone anyway
+
+    def send_messages(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        started = time.monotonic()
+        results = [self.send_message(message) for message in messages]
+        self.stats['seconds'] += time.monotonic() - started
+        self.stats['batches'] += 1
+        return results
+
+    def send_message(self, message: EmailMessage) -> Exception | None:
+        error = None
+        for _ in range(2):
+            try:
+                self.open().send_messages([message])
+            except self.reconnect_errors as e:
+                self.close()
+                error = e
+            except Exception as e:
+                error = e
+                break
+            else:
+                self.stats['sent'] += 1
+                return None
+
+        self.stats['failed'] += 1
+        return error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,149 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.email.email import BatchSender, build_message
+from core.models import OutgoingEmail
+
+__all__ = (
+    'claim_batch',
+    'enqueue_email',
+    'process_batch',
+    'purge_outbox',
+)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(
+        subject: str,
+        body: str,
+        to: list[str],
+        bcc: list[str] | None = None,
+        cc: list[str] | None = None,
+        reply_to: list[str] | None = None,
+) -> OutgoingEmail:
+    """
+    Store the message in the outbox, it joins the caller's transaction
+    so it is only delivered if the surrounding changes are committed.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=to,
+        bcc=bcc,
+        cc=cc,
+        reply_to=reply_to,
+    )
+
+
+def get_backoff(attempts: int) -> timedelta:
+    options = settings.EMAIL_OUTBOX
+    delay = options['BACKOFF'] * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, options['MAX_BACKOFF']))
+
+
+def claim_batch(size: int) -> list[OutgoingEmail]:
+    """
+    Lease up to `size` due messages. Leased messages are hidden from
+    other workers until `LEASE` seconds pass, so a crashed worker's
+    batch is picked up again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:size]
+        )
+        lease = timedelta(seconds=settings.EMAIL_OUTBOX['LEASE'])
+        OutgoingEmail.objects.filter(id__in=ids).update(next_attempt_at=now + lease)
+
+    return list(OutgoingEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def deliver(sender: BatchSender, messages: list[OutgoingEmail]) -> list[Exception | None]:
+    return sender.send_messages([
+        build_message(
+            subject=message.subject,
+            body=message.body,
+            to=message.to,
+            bcc=message.bcc,
+            cc=message.cc,
+            reply_to=message.reply_to,
+        )
+        for message in messages
+    ])
+
+
+def mark_sent(message: OutgoingEmail):
+    # bodies carry reset and confirmation links, they are not kept once delivered
+    message.status = OutgoingEmail.Status.SENT
+    message.body = ''
+    message.attempts += 1
+    message.sent_at = timezone.now()
+    message.last_error = ''
+    message.save(update_fields=['status', 'body', 'attempts', 'sent_at', 'last_error'])
+
+
+def mark_failed(message: OutgoingEmail, error: Exception):
+    message.attempts += 1
+    message.last_error = repr(error)
+
+    if message.attempts >= settings.EMAIL_OUTBOX['MAX_ATTEMPTS']:
+        message.status = OutgoingEmail.Status.DEAD
+        logger.error('Email %s moved to dead letters after %s attempts: %r', message.pk, message.attempts, error)
+    else:
+        message.next_attempt_at = timezone.now() + get_backoff(message.attempts)
+        logger.warning('Email %s failed, attempt %s: %r', message.pk, message.attempts, error)
+
+    message.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error'])
+
+
+def process_batch(executor: ThreadPoolExecutor, senders: list[BatchSender], size: int) -> dict:
+    """
+    Deliver one batch, split between `senders` which run on the
+    executor's threads and keep their connections open between batches.
+    Results are written back from the calling thread only.
+    """
+    messages = claim_batch(size)
+    stats = {'sent': 0, 'failed': 0, 'dead': 0}
+
+    chunks = [
+        (sender, messages[i::len(senders)])
+        for i, sender in enumerate(senders)
+        if messages[i::len(senders)]
+    ]
+    results = {}
+    for (_, chunk), errors in zip(chunks, executor.map(lambda args: deliver(*args), chunks), strict=True):
+        results.update(zip((message.pk for message in chunk), errors, strict=True))
+
+    for message in messages:
+        error = results[message.pk]
+        if error is None:
+            mark_sent(message)
+            stats['sent'] += 1
+        else:
+            mark_failed(message, error)
+            stats['dead' if message.status == OutgoingEmail.Status.DEAD else 'failed'] += 1
+
+    return stats
+
+
+def purge_outbox() -> int:
+    """
+    Delete sent messages and dead letters older than `RETENTION` days,
+    returns the number of deleted messages.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EMAIL_OUTBOX['RETENTION'])
+    deleted, _ = OutgoingEmail.objects.filter(
+        status__in=[OutgoingEmail.Status.SENT, OutgoingEmail.Status.DEAD],
+        created_at__lt=cutoff,
+    ).delete()
+    return deleted
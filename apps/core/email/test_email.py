@@ -1,4 +1,63 @@
-from .email import send_email
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from .email import BatchSender, build_message, send_email
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+class SMTPServer:
+    """
+    Local aiosmtpd server, `restart` drops every open client connection.
+    """
+
+    def __init__(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        self.handler = RecordingHandler()
+        self.controller = None
+
+    def start(self):
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=self.port)
+        self.controller.start()
+
+    def stop(self):
+        self.controller.stop()
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = SMTPServer()
+    server.start()
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = '127.0.0.1'
+    settings.EMAIL_PORT = server.port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+
+    yield server
+    server.stop()
 
 
 def test_send_email(mailoutbox):
@@ -18,3 +77,41 @@ def test_send_email(mailoutbox):
     assert email.subject == 'Test subject'
     assert email.to == ['davitovmasyan@gmail.com']
     assert email.body == '<h1>Greetings Davit!</h1>'
+
+
+def make_messages(count: int) -> list:
+    return [
+        build_message(subject=f'Message {i}', body='<p>body</p>', to=[f'user{i}@example.com'])
+        for i in range(count)
+    ]
+
+
+def test_batch_sender_reuses_connection(smtp_server):
+    handler = smtp_server.handler
+
+    with BatchSender() as sender:
+        assert sender.send_messages(make_messages(3)) == [None] * 3
+        assert sender.send_messages(make_messages(2)) == [None] * 2
+
+    assert len(handler.messages) == 5
+    assert handler.sessions == 1
+    assert sender.stats['sent'] == 5
+    assert sender.stats['connections'] == 1
+    assert sender.stats['batches'] == 2
+    assert sender.throughput > 0
+    assert sender.connection is None
+
+
+def test_batch_sender_reconnects(smtp_server):
+    handler = smtp_server.handler
+
+    with BatchSender() as sender:
+        assert sender.send_messages(make_messages(1)) == [None]
+
+        smtp_server.restart()
+
+        assert sender.send_messages(make_messages(2)) == [None, None]
+
+    assert len(handler.messages) == 3
+    assert sender.stats['connections'] == 2
+    assert sender.stats['failed'] == 0
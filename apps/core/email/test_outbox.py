@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from .email import BatchSender, send_email
+from .outbox import claim_batch, process_batch, purge_outbox
+
+
+@pytest.fixture
+def outbox(settings):
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'ENABLED': True, 'MAX_ATTEMPTS': 2}
+
+
+def queue_email(to='davitovmasyan@gmail.com'):
+    send_email(
+        subject='Test subject',
+        template_name='core/email/blank.html',
+        context={'recipient_name': 'Davit'},
+        to=to,
+    )
+
+
+@pytest.mark.django_db
+def test_send_email_enqueues(outbox, mailoutbox):
+    queue_email()
+
+    assert len(mailoutbox) == 0
+    message = OutgoingEmail.objects.get()
+    assert message.to == ['davitovmasyan@gmail.com']
+    assert message.status == OutgoingEmail.Status.PENDING
+
+    call_command('send_emails', '--once', stdout=mock.MagicMock())
+
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].body == '<h1>Greetings Davit!</h1>'
+    message.refresh_from_db()
+    assert message.status == OutgoingEmail.Status.SENT
+    assert message.sent_at is not None
+    assert message.body == ''
+
+
+@pytest.mark.django_db
+def test_claim_batch_leases_messages(outbox):
+    queue_email()
+    queue_email()
+
+    assert len(claim_batch(size=1)) == 1
+    assert len(claim_batch(size=10)) == 1
+    assert claim_batch(size=10) == []
+
+
+@pytest.mark.django_db
+def test_process_batch_retries_and_dead_letters(outbox, mailoutbox):
+    queue_email()
+
+    senders = [BatchSender(), BatchSender()]
+    with (
+        mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=ValueError('rejected')),
+        ThreadPoolExecutor(max_workers=2) as executor,
+    ):
+        assert process_batch(executor, senders, size=10) == {'sent': 0, 'failed': 1, 'dead': 0}
+
+        message = OutgoingEmail.objects.get()
+        assert message.attempts == 1
+        assert 'rejected' in message.last_error
+        assert process_batch(executor, senders, size=10) == {'sent': 0, 'failed': 0, 'dead': 0}  # backing off
+
+        OutgoingEmail.objects.update(next_attempt_at=message.created_at)
+        assert process_batch(executor, senders, size=10) == {'sent': 0, 'failed': 0, 'dead': 1}
+
+    message.refresh_from_db()
+    assert message.status == OutgoingEmail.Status.DEAD
+    assert len(mailoutbox) == 0
+
+
+@pytest.mark.django_db
+def test_purge_outbox(outbox):
+    for _ in range(3):
+        queue_email()
+    sent, dead, pending = OutgoingEmail.objects.order_by('id')
+    OutgoingEmail.objects.filter(pk=sent.pk).update(status=OutgoingEmail.Status.SENT)
+    OutgoingEmail.objects.filter(pk=dead.pk).update(status=OutgoingEmail.Status.DEAD)
+
+    assert purge_outbox() == 0
+
+    OutgoingEmail.objects.update(created_at=timezone.now() - timedelta(days=8))
+
+    assert purge_outbox() == 2
+    assert list(OutgoingEmail.objects.all()) == [pending]
@@ -1,5 +1,6 @@
 from typing import Any
 
+from ninja.errors import ValidationError
 from pydantic_core import PydanticCustomError
 
 
@@ -24,8 +25,23 @@ def invalid_credentials_error():
         'provided credentials are not valid',
     )
 
+def incorrect_password_error():
+    return PydanticCustomError(
+        'incorrect_password',
+        'current password is incorrect',
+    )
+
+
 def limit_exceeded():
     return PydanticCustomError(
         'limit_exceeded',
         'limit exceeded',
     )
+
+
+def as_validation_error(error: PydanticCustomError, loc: tuple = ('body', 'payload')) -> ValidationError:
+    """
+    Wrap an error detected outside of schema validation (e.g. in an
+    async handler) so it is answered with 422 like validator errors.
+    """
+    return ValidationError([{'type': error.type, 'loc': loc, 'msg': error.message()}])
@@ -0,0 +1,83 @@
+from functools import cache
+
+from django.http import HttpRequest
+from ninja import Schema
+from pydantic import Field, create_model, field_validator, model_validator
+
+__all__ = (
+    'SparseFieldsSchema',
+    'fields_query',
+)
+
+
+class SparseFieldsSchema(Schema):
+    """
+    Response schema honoring `?fields=`. When the request selected a subset
+    of its fields (see `fields_query`) only those are validated and
+    serialized, the others may be missing from the source row.
+    """
+
+    @model_validator(mode='wrap')
+    @classmethod
+    def _validate_sparse_fields(cls, data, handler, info):
+        request = (info.context or {}).get('request')
+        fields = getattr(request, 'sparse_fields', {}).get(cls)
+        if fields is None or isinstance(data, cls):
+            return handler(data)
+
+        validated = get_sparse_model(cls, fields).model_validate(data, context=info.context)
+        instance = cls.model_construct(_fields_set=set(fields), **dict(validated))
+        # drop the defaults `model_construct` filled in, missing fields aren't serialized
+        for name in cls.model_fields.keys() - set(fields):
+            instance.__dict__.pop(name, None)
+        return instance
+
+
+@cache
+def get_sparse_model(schema: type[Schema], fields: tuple[str, ...]) -> type[Schema]:
+    model = create_model(
+        f'{schema.__name__}Sparse',
+        __base__=Schema,
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+    # `resolve_<field>` methods of the schema keep computing the selected fields
+    model._ninja_resolvers = {name: resolver for name, resolver in schema._ninja_resolvers.items() if name in fields}
+    return model
+
+
+def fields_query(schema: type[SparseFieldsSchema]) -> type[Schema]:
+    """
+    Query schema of a `fields` parameter selecting a comma separated
+    subset of `schema`'s fields, unknown names are rejected with 422.
+    """
+    allowed = tuple(schema.model_fields)
+
+    class FieldsQuery(Schema):
+        fields: str | None = Field(None, description=f'Comma separated subset of: {", ".join(allowed)}.')
+
+        @field_validator('fields')
+        @classmethod
+        def validate_fields(cls, value: str | None) -> str | None:
+            if value is None:
+                return None
+
+            names = [name.strip() for name in value.split(',') if name.strip()]
+            unknown = [name for name in names if name not in allowed]
+            if unknown:
+                raise ValueError(f'unknown fields: {", ".join(unknown)}, allowed: {", ".join(allowed)}')
+            return ','.join(dict.fromkeys(names)) or None
+
+        def apply(self, request: HttpRequest) -> tuple[str, ...] | None:
+            """
+            Select the fields for `schema` in this request's response
+            and return them, `None` when all fields are wanted.
+            """
+            if not self.fields:
+                return None
+
+            fields = tuple(self.fields.split(','))
+            request.sparse_fields = {**getattr(request, 'sparse_fields', {}), schema: fields}
+            return fields
+
+    FieldsQuery.__name__ = FieldsQuery.__qualname__ = f'{schema.__name__}Fields'
+    return FieldsQuery
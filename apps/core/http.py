@@ -0,0 +1,47 @@
+import hashlib
+from datetime import datetime
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+__all__ = (
+    'conditional_response',
+    'make_etag',
+)
+
+
+def make_etag(*parts) -> str:
+    """
+    Quoted ETag from the parts identifying a representation,
+    e.g. the object id and its last modification time.
+    """
+    digest = hashlib.md5(':'.join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def conditional_response(
+        request: HttpRequest,
+        response: HttpResponse,
+        etag: str,
+        last_modified: datetime | None = None,
+) -> HttpResponse | None:
+    """
+    Set validators and `Cache-Control` on the operation's temporal `response`
+    and return `304 Not Modified` when the request's `If-None-Match`
+    or `If-Modified-Since` still matches, `None` otherwise.
+
+    Responses are private and revalidated on every use,
+    so clients never show data staler than one round trip.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response.headers['ETag'] = etag
+    if timestamp is not None:
+        response.headers['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=timestamp, response=response)
+    # Django hands `response` back when no precondition applies
+    return None if conditional is response else conditional
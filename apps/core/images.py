@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import IO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+__all__ = (
+    'ImageInfo',
+    'InvalidImage',
+    'make_variants',
+    'normalize_image',
+    'probe_image',
+)
+
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'WEBP': 'webp',
+}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    format: str
+    width: int
+    height: int
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+def probe_image(file: IO[bytes], formats: tuple[str, ...], max_pixels: int) -> ImageInfo:
+    """
+    Identify the image in `file` from its header, without decoding it.
+    Only the `formats` decoders are tried and images of more than
+    `max_pixels` pixels are rejected, so decompression bombs are caught
+    before anything is allocated for them.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file, formats=formats) as image:
+            info = ImageInfo(image.format, *image.size)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f'not a valid {"/".join(formats)} image') from e
+    finally:
+        file.seek(0)
+
+    if info.pixels > max_pixels:
+        raise InvalidImage(f'image is too large: {info.width}x{info.height} pixels')
+    return info
+
+
+def normalize_image(file: IO[bytes], max_dimension: int) -> tuple[bytes, str]:
+    """
+    Decode `file`, apply its EXIF orientation, fit it in `max_dimension`
+    and re-encode it without metadata: PNG when it has transparency,
+    JPEG otherwise. Returns the encoded bytes and their file extension.
+    """
+    file.seek(0)
+    with Image.open(file) as image:
+        # JPEGs are decoded at a reduced scale right away when large
+        image.draft('RGB', (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+
+        output = BytesIO()
+        if has_transparency(image):
+            image.convert('RGBA').save(output, 'PNG', optimize=True)
+            return output.getvalue(), 'png'
+
+        image.convert('RGB').save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return output.getvalue(), 'jpg'
+
+
+def make_variants(file: IO[bytes], sizes: tuple[int, ...], formats: tuple[str, ...]) -> dict[int, dict[str, bytes]]:
+    """
+    Square thumbnails of the image in `file`, cropped around the center,
+    for every size and format: `{size: {extension: bytes}}`. Images
+    smaller than a size are not upscaled.
+    """
+    file.seek(0)
+    variants = {}
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if has_transparency(image) else 'RGB')
+
+        for size in sorted(sizes, reverse=True):
+            side = min(size, *image.size)
+            thumbnail = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+            variants[size] = {EXTENSIONS[image_format]: encode(thumbnail, image_format) for image_format in formats}
+    return variants
+
+
+def encode(image: Image.Image, image_format: str) -> bytes:
+    output = BytesIO()
+    if image_format == 'JPEG':
+        if image.mode == 'RGBA':
+            image = flatten(image)
+        image.save(output, image_format, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif image_format == 'WEBP':
+        image.save(output, image_format, quality=WEBP_QUALITY, method=4)
+    else:
+        image.save(output, image_format, optimize=True)
+    return output.getvalue()
+
+
+def flatten(image: Image.Image) -> Image.Image:
+    """
+    Composite an RGBA image on white, formats without alpha
+    would otherwise show whatever color the transparent pixels hold.
+    """
+    background = Image.new('RGBA', image.size, 'white')
+    return Image.alpha_composite(background, image).convert('RGB')
+
+
+def has_transparency(image: Image.Image) -> bool:
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.blobs import collect_garbage, collect_orphans
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed files nothing references anymore.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=settings.BLOBS['GRACE'],
+            help='Seconds a file must be unreferenced before it is deleted.',
+        )
+        parser.add_argument(
+            '--orphans', action='store_true',
+            help='Also delete stored files without a reference count, left by interrupted uploads.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = collect_garbage(options['grace'])
+        self.stdout.write(f'unreferenced files deleted: {deleted}')
+
+        if options['orphans']:
+            deleted = collect_orphans(options['grace'])
+            self.stdout.write(f'orphaned files deleted: {deleted}')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.uploads import expire_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions past their expiry and their files.'
+
+    def handle(self, *args, **options):
+        deleted = expire_sessions()
+        self.stdout.write(f'expired upload sessions deleted: {deleted}')
@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.email.email import BatchSender
+from core.email.outbox import process_batch, purge_outbox
+from core.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Deliver emails from the outbox.'
+
+    def add_arguments(self, parser):
+        options = settings.EMAIL_OUTBOX
+        parser.add_argument('--workers', type=int, default=options['WORKERS'])
+        parser.add_argument('--batch-size', type=int, default=options['BATCH_SIZE'])
+        parser.add_argument('--poll-interval', type=float, default=options['POLL_INTERVAL'])
+        parser.add_argument('--once', action='store_true', help='Drain due messages and exit.')
+        parser.add_argument('--dead-letters', action='store_true', help='List dead letters and exit.')
+
+    def handle(self, *args, **options):
+        if options['dead_letters']:
+            return self.report_dead_letters()
+
+        senders = [BatchSender() for _ in range(options['workers'])]
+        purged_at = None
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                while True:
+                    stats = process_batch(executor, senders, options['batch_size'])
+                    if any(stats.values()):
+                        self.stdout.write('sent: {sent}, failed: {failed}, dead: {dead}'.format(**stats))
+                        self.report_throughput(senders)
+                        continue
+
+                    if purged_at is None or time.monotonic() - purged_at >= settings.EMAIL_OUTBOX['PURGE_INTERVAL']:
+                        if purged := purge_outbox():
+                            self.stdout.write(f'purged: {purged}')
+                        purged_at = time.monotonic()
+
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+        finally:
+            for sender in senders:
+                sender.close()
+
+    def report_throughput(self, senders: list[BatchSender]):
+        sent = sum(sender.stats['sent'] for sender in senders)
+        connections = sum(sender.stats['connections'] for sender in senders)
+        throughput = sum(sender.throughput for sender in senders)
+        self.stdout.write(f'total sent: {sent}, connections: {connections}, throughput: {throughput:.1f} msg/s')
+
+    def report_dead_letters(self):
+        dead = OutgoingEmail.objects.filter(status=OutgoingEmail.Status.DEAD).order_by('id')
+        for message in dead:
+            self.stdout.write(f'{message.pk}\t{message.attempts}\t{message}\t{message.last_error}')
+        self.stdout.write(f'{dead.count()} dead letter(s)')
@@ -0,0 +1,175 @@
+import mimetypes
+import os
+import re
+from stat import S_ISREG
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+from core.blobs import is_blob
+from core.http import make_etag
+
+__all__ = (
+    'serve_media',
+)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+class RangeFile:
+    """
+    Reads at most `length` bytes of `file` from its current position.
+    """
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def can_access(request: HttpRequest, name: str) -> bool:
+    """
+    Files under `MEDIA_SERVING['PUBLIC']`, named by content hash or random
+    UUIDs, are readable by anyone with the URL, the rest by staff only.
+    """
+    if name.startswith(settings.MEDIA_SERVING['PUBLIC']):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    First and last byte of a single `Range: bytes=…` header. `None` when
+    the whole file should be sent: no, malformed or multiple ranges.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        suffix = int(end)
+        if suffix == 0:
+            raise RangeNotSatisfiable
+        return max(size - suffix, 0), size - 1
+
+    start = int(start)
+    if end and start > int(end):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, (min(int(end), size - 1) if end else size - 1)
+
+
+def if_range_matches(request: HttpRequest, etag: str, last_modified: int) -> bool:
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def set_headers(response: HttpResponse, name: str, etag: str, last_modified: int):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    if is_blob(name):
+        # named by content hash, a blob never changes
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    elif name.startswith(settings.MEDIA_SERVING['PUBLIC']):
+        patch_cache_control(response, public=True, no_cache=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+
+
+def file_response(request: HttpRequest, path: str, size: int, content_type: str, etag: str, last_modified: int):
+    """
+    Stream the file from Django, with `wsgi.file_wrapper` (sendfile on
+    gunicorn) when the whole file is sent, honoring a single `Range`.
+    """
+    header = request.headers.get('Range')
+    byte_range = None
+    if header and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(RangeFile(file, end - start + 1), status=206, content_type=content_type)
+        response.headers['Content-Length'] = str(end - start + 1)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_media(request: HttpRequest, name: str) -> HttpResponse:
+    """
+    Authorize a request for the media file `name` and send it. With
+    `MEDIA_SERVING['BACKEND']` set to `nginx` (`X-Accel-Redirect`) or
+    `sendfile` (`X-Sendfile`) only headers are sent from here and the web
+    server transfers the bytes, handling `Range` itself, otherwise the
+    file is streamed by Django. Conditional requests are answered here
+    without touching the file.
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation as e:
+        raise Http404 from e
+    # authorize and redirect with the resolved name, `blobs/../exports/…` is not a blob
+    name = os.path.relpath(path, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+    # unauthorized requests can't tell protected files from missing ones
+    if not can_access(request, name):
+        raise Http404
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise Http404 from e
+    if not S_ISREG(stat.st_mode):
+        raise Http404
+
+    etag = make_etag(name, stat.st_size, stat.st_mtime_ns)
+    last_modified = int(stat.st_mtime)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        options = settings.MEDIA_SERVING
+        if options['BACKEND'] == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            response.headers['X-Accel-Redirect'] = quote(options['INTERNAL_URL'] + name)
+        elif options['BACKEND'] == 'sendfile':
+            response = HttpResponse(content_type=content_type)
+            response.headers['X-Sendfile'] = path
+        else:
+            response = file_response(request, path, stat.st_size, content_type, etag, last_modified)
+
+    set_headers(response, name, etag, last_modified)
+    return response
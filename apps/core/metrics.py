@@ -0,0 +1,140 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+__all__ = (
+    'Histogram',
+    'Metrics',
+    'RequestStats',
+    'metrics',
+    'record_query',
+    'request_stats',
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LABELS = ('operation', 'method', 'status')
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Stats of the request being served. Context variables are copied into
+# the threads `sync_to_async` runs ORM calls on, so their queries count too.
+request_stats: ContextVar[RequestStats | None] = ContextVar('request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    `connection.execute_wrapper` timing queries into the current request's stats.
+    """
+    stats = request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def format_labels(pairs: list[tuple[str, str]]) -> str:
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """
+    Cumulative histogram per label values, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, name: str, description: str, buckets: tuple, labels: tuple[str, ...] = LABELS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            sample = self._samples.get(labels)
+            if sample is None:
+                sample = self._samples[labels] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+            sample['sum'] += value
+            sample['count'] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            samples = sorted((labels, {**sample, 'buckets': list(sample['buckets'])})
+                             for labels, sample in self._samples.items())
+
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for labels, sample in samples:
+            pairs = list(zip(self.labels, labels, strict=True))
+            for bound, count in zip(self.buckets, sample['buckets'], strict=True):
+                lines.append(f'{self.name}_bucket{format_labels([*pairs, ("le", bound)])} {count}')
+            lines.append(f'{self.name}_bucket{format_labels([*pairs, ("le", "+Inf")])} {sample["count"]}')
+            lines.append(f'{self.name}_sum{format_labels(pairs)} {sample["sum"]}')
+            lines.append(f'{self.name}_count{format_labels(pairs)} {sample["count"]}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+class Metrics:
+    """
+    Request metrics of this process. Every worker process keeps its own,
+    Prometheus aggregates them across the scraped instances.
+    """
+
+    def __init__(self):
+        self.duration = Histogram(
+            'http_request_duration_seconds', 'Time spent serving the request.', LATENCY_BUCKETS,
+        )
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'Database queries executed per request.', QUERY_BUCKETS,
+        )
+        self.db_duration = Histogram(
+            'http_request_db_duration_seconds', 'Time spent in database queries per request.', LATENCY_BUCKETS,
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Size of the response body.', SIZE_BUCKETS,
+        )
+
+    @property
+    def histograms(self) -> list[Histogram]:
+        return [self.duration, self.db_queries, self.db_duration, self.response_size]
+
+    def observe(self, labels: tuple, seconds: float, stats: RequestStats, size: int | None):
+        self.duration.observe(labels, seconds)
+        self.db_queries.observe(labels, stats.queries)
+        self.db_duration.observe(labels, stats.db_seconds)
+        if size is not None:
+            self.response_size.observe(labels, size)
+
+    def render(self) -> str:
+        return '\n'.join(line for histogram in self.histograms for line in histogram.render()) + '\n'
+
+    def clear(self):
+        for histogram in self.histograms:
+            histogram.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,62 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from core.metrics import RequestStats, metrics, request_stats
+
+__all__ = (
+    'MetricsMiddleware',
+)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database queries and response size per operation
+    into `core.metrics.metrics` and reports them in `Server-Timing`.
+    Put it first so the time spent in other middleware counts too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    def finish(self, request, response, stats: RequestStats, seconds: float):
+        match = getattr(request, 'resolver_match', None)
+        labels = (match.view_name if match else 'unmatched', request.method, str(response.status_code))
+        size = None if response.streaming else len(response.content)
+        metrics.observe(labels, seconds, stats, size)
+
+        if settings.METRICS['SERVER_TIMING']:
+            response['Server-Timing'] = (
+                f'app;dur={seconds * 1000:.1f}, '
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+            )
+        return response
@@ -0,0 +1,88 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+__all__ = (
+    'Blob',
+    'OutgoingEmail',
+    'UploadSession',
+)
+
+
+class OutgoingEmail(models.Model):
+    """
+    Transactional outbox for emails, rows are written together with
+    the data they are about and delivered by `manage.py send_emails`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENT = 'sent'
+        DEAD = 'dead'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to = models.JSONField(default=list)
+    cc = models.JSONField(null=True, blank=True)
+    bcc = models.JSONField(null=True, blank=True)
+    reply_to = models.JSONField(null=True, blank=True)
+
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_email_outbox_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
+
+
+class Blob(models.Model):
+    """
+    Reference count of a content-addressed file, see `core.blobs`.
+    Files nothing references anymore are deleted by `manage.py collect_blobs`.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['references', 'released_at'], name='core_blob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
+
+
+class UploadSession(models.Model):
+    """
+    Resumable upload sent in chunks, appended to a file in
+    `UPLOADS['SESSION_ROOT']` until it is finalized, see `core.uploads`.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    # `<algorithm> <base64 digest>` of the whole file, checked when finalized
+    checksum = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.id} ({self.offset}/{self.size})'
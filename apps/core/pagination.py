@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from ninja import Field, Schema
+from ninja.errors import ValidationError
+from ninja.pagination import AsyncPaginationBase
+
+__all__ = (
+    'CursorPagination',
+)
+
+
+def get_model_field(model, path: str):
+    """
+    Field at the end of a lookup path like `profile__created_at`.
+    """
+    *relations, name = path.split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class CursorPagination(AsyncPaginationBase):
+    """
+    Keyset pagination over `ordering` fields.
+
+    Pages are fetched with `WHERE (ordering) > (cursor)` instead of
+    `OFFSET`, so deep pages cost the same as the first one and no
+    `COUNT(*)` is issued unless `estimate_count` is requested.
+    The last `ordering` field must be unique (usually `id`).
+    """
+
+    class Input(Schema):
+        cursor: str | None = None
+        limit: int = Field(
+            settings.NINJA_PAGINATION_PER_PAGE,
+            ge=1,
+            le=settings.NINJA_PAGINATION_MAX_LIMIT,
+        )
+        estimate_count: bool = False
+
+    class Output(Schema):
+        items: list[Any]
+        next: str | None = None
+        previous: str | None = None
+        count: int | None = None
+
+    def __init__(self, ordering: tuple[str, ...] = ('id',), **kwargs):
+        self.ordering = ordering
+        super().__init__(**kwargs)
+
+    def paginate_queryset(self, queryset: QuerySet, pagination: Input, **params) -> dict:
+        page = self.get_page(queryset, pagination)
+        result = self.get_result(list(page), pagination)
+        if pagination.estimate_count:
+            result['count'] = self.estimate_count(queryset)
+        return result
+
+    async def apaginate_queryset(self, queryset: QuerySet, pagination: Input, **params) -> dict:
+        page = self.get_page(queryset, pagination)
+        result = self.get_result([item async for item in page], pagination)
+        if pagination.estimate_count:
+            result['count'] = await sync_to_async(self.estimate_count)(queryset)
+        return result
+
+    def get_page(self, queryset: QuerySet, pagination: Input) -> QuerySet:
+        """
+        One row past `limit` is fetched to know whether another page exists.
+        """
+        values, reverse = self.decode_cursor(pagination.cursor)
+
+        page = queryset.order_by(*self.get_order_by(reverse))
+        if values is not None:
+            values = self.clean_cursor_values(queryset.model, values)
+            page = page.filter(self.get_keyset_filter(values, reverse))
+        return page[:pagination.limit + 1]
+
+    def get_result(self, items: list, pagination: Input) -> dict:
+        values, reverse = self.decode_cursor(pagination.cursor)
+
+        has_more = len(items) > pagination.limit
+        items = items[:pagination.limit]
+        if reverse:
+            items.reverse()
+
+        has_next, has_previous = (True, has_more) if reverse else (has_more, values is not None)
+        return {
+            'items': items,
+            'next': self.encode_cursor(items[-1], reverse=False) if items and has_next else None,
+            'previous': self.encode_cursor(items[0], reverse=True) if items and has_previous else None,
+            'count': None,
+        }
+
+    def get_order_by(self, reverse: bool) -> list[str]:
+        prefix = '-' if reverse else ''
+        return [prefix + field for field in self.ordering]
+
+    def get_keyset_filter(self, values: list, reverse: bool) -> Q:
+        """
+        Expand `(a, b) > (x, y)` into `a > x OR (a = x AND b > y)`.
+        """
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            term = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], values[:i], strict=True):
+                term &= Q(**{prev_field: prev_value})
+            condition |= term
+        return condition
+
+    def encode_cursor(self, item, reverse: bool) -> str:
+        if isinstance(item, dict):  # rows of `.values()` querysets
+            values = [item[field] for field in self.ordering]
+        else:
+            values = [getattr(item, field) for field in self.ordering]
+        data = json.dumps({'v': values, 'r': reverse}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor: str | None) -> tuple[list | None, bool]:
+        if not cursor:
+            return None, False
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values, reverse = data['v'], bool(data['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ValidationError([{'type': 'cursor', 'msg': 'cursor is not valid.'}]) from None
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError([{'type': 'cursor', 'msg': 'cursor is not valid.'}])
+
+        return values, reverse
+
+    def clean_cursor_values(self, model, values: list) -> list:
+        """
+        Convert decoded cursor values with their ordering fields, a tampered
+        cursor is answered with 422 instead of failing in the query.
+        """
+        cleaned = []
+        for field, value in zip(self.ordering, values, strict=True):
+            try:
+                value = get_model_field(model, field).to_python(value)
+            except (DjangoValidationError, ValueError, TypeError):
+                value = None
+            if value is None:
+                raise ValidationError([{'type': 'cursor', 'msg': 'cursor is not valid.'}])
+            cleaned.append(value)
+        return cleaned
+
+    @staticmethod
+    def estimate_count(queryset: QuerySet) -> int:
+        """
+        Row estimate from the Postgres planner statistics,
+        other backends fall back to an exact count.
+        """
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.count()
+
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
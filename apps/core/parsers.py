@@ -0,0 +1,18 @@
+import orjson
+from django.http import HttpRequest
+from ninja.parser import Parser
+from ninja.types import DictStrAny
+
+__all__ = (
+    'ORJSONParser',
+)
+
+
+class ORJSONParser(Parser):
+    """
+    Request bodies are parsed with orjson, invalid JSON raises
+    `orjson.JSONDecodeError` which ninja answers with 400.
+    """
+
+    def parse_body(self, request: HttpRequest) -> DictStrAny:
+        return orjson.loads(request.body)
@@ -0,0 +1,60 @@
+from functools import cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from ninja import Schema
+
+__all__ = (
+    'get_schema_columns',
+    'project',
+)
+
+
+@cache
+def get_schema_columns(
+        schema: type[Schema],
+        model: type[Model],
+        fields: tuple[str, ...] | None = None,
+) -> tuple[str, ...]:
+    """
+    Concrete, non many-to-many fields of `model` that `schema` reads,
+    limited to the schema `fields` when given. Schema fields without
+    a matching model field (resolvers, properties) are skipped.
+    """
+    columns = []
+    for name, field in schema.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+
+        source = field.alias or name
+        if source == 'pk':
+            source = model._meta.pk.name
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            continue
+
+        if model_field.concrete and not model_field.many_to_many:
+            columns.append(model_field.name)
+    return tuple(columns)
+
+
+def project(
+        queryset: QuerySet,
+        schema: type[Schema],
+        *extra: str,
+        values: bool = False,
+        fields: tuple[str, ...] | None = None,
+) -> QuerySet:
+    """
+    Load only the columns `schema` serializes, or its sparse `fields`,
+    plus `extra`.
+
+    With `values` rows come back as dicts instead of model instances,
+    cheaper to build but every schema field must then be a column.
+    """
+    columns = dict.fromkeys([*get_schema_columns(schema, queryset.model, fields), *extra])
+    if values:
+        return queryset.values(*columns)
+    return queryset.only(*columns)
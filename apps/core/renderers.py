@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from django.http import HttpRequest
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+__all__ = (
+    'ORJSONRenderer',
+)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer on orjson. Datetimes, UUIDs, enums and dataclasses are
+    encoded natively, anything else (Decimal, lazy strings, pydantic
+    types) falls back to ninja's default encoder.
+    """
+
+    media_type = 'application/json'
+    option = orjson.OPT_NON_STR_KEYS
+
+    def __init__(self):
+        self.default = NinjaJSONEncoder().default
+
+    def render(self, request: HttpRequest, data: Any, *, response_status: int) -> bytes:
+        return orjson.dumps(data, default=self.default, option=self.option)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+from core.cache import LRUCache
+
+__all__ = (
+    'ReplicaRouter',
+    'choose_read_alias',
+    'pin_to_primary',
+    'read_replica',
+    'replica_lag',
+)
+
+logger = logging.getLogger(__name__)
+
+# Alias reads of the current request go to, set by `read_replica`.
+_read_alias = ContextVar('read_alias', default=None)
+
+_lag_cache = LRUCache(max_size=64, timeout=settings.DATABASE_ROUTING['LAG_CHECK_INTERVAL'])
+
+PG_LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica chosen for the current request by
+    `read_replica`, everything else goes to `default`.
+    Replicas are never migrated, they follow the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {'default', *settings.DATABASE_ROUTING['REPLICAS']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_ROUTING['REPLICAS']:
+            return False
+        return None
+
+
+def get_pin_cache():
+    return caches[settings.DATABASE_ROUTING['CACHE_ALIAS']]
+
+
+def get_pin_key(user_id) -> str:
+    return f'core:primary-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """
+    Read `user_id`'s requests from the primary for `PIN_SECONDS`,
+    so they see their own writes before the replicas catch up.
+    """
+    if user_id is not None and settings.DATABASE_ROUTING['REPLICAS']:
+        get_pin_cache().set(get_pin_key(user_id), True, settings.DATABASE_ROUTING['PIN_SECONDS'])
+
+
+def replica_lag(alias: str) -> float:
+    """
+    Replication delay of `alias` in seconds, cached for `LAG_CHECK_INTERVAL`.
+    Unreachable replicas report an infinite lag.
+    """
+    lag = _lag_cache.get(alias)
+    if lag is not None:
+        return lag
+
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        lag = 0.0
+    else:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(PG_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning('Replica %s is unreachable', alias, exc_info=True)
+            lag = float('inf')
+
+    _lag_cache.set(alias, lag)
+    return lag
+
+
+def choose_read_alias(user_id=None) -> str:
+    """
+    A random replica within `MAX_LAG`, `default` when there is none
+    or `user_id` recently wrote and is pinned to the primary.
+    """
+    options = settings.DATABASE_ROUTING
+    if not options['REPLICAS']:
+        return 'default'
+    if user_id is not None and get_pin_cache().get(get_pin_key(user_id)):
+        return 'default'
+
+    replicas = [alias for alias in options['REPLICAS'] if replica_lag(alias) <= options['MAX_LAG']]
+    return random.choice(replicas) if replicas else 'default'
+
+
+def read_replica(view_func):
+    """
+    Route the ORM reads of a view to a replica. Put it right below the
+    router's method decorator, so authentication has already run.
+    """
+
+    def get_user_id(request):
+        return getattr(getattr(request, 'auth', None), 'pk', None)
+
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_view(request, *args, **kwargs):
+            token = _read_alias.set(await sync_to_async(choose_read_alias)(get_user_id(request)))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_view
+
+    @wraps(view_func)
+    def view(request, *args, **kwargs):
+        token = _read_alias.set(choose_read_alias(get_user_id(request)))
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return view
@@ -1,4 +1,8 @@
+from datetime import datetime
+from uuid import UUID
+
 from ninja import Schema
+from pydantic import Field
 
 
 class DefaultOKResponse(Schema):
@@ -18,3 +22,25 @@ class DefaultNotFoundResponse(Schema):
 
 class DefaultDeleteResponse(Schema):
     message: str = 'The resource successfully deleted.'
+
+
+class DatabaseStatsResponse(Schema):
+    alias: str
+    vendor: str
+    pooled: bool
+    conn_max_age: int | None
+    conn_health_checks: bool
+    pool: dict[str, int]
+
+
+class UploadSessionPayload(Schema):
+    size: int = Field(gt=0)
+    # `<algorithm> <base64 digest>` of the whole file, e.g. `sha256 47DEQpj8...`
+    checksum: str = ''
+
+
+class UploadSessionResponse(Schema):
+    id: UUID
+    size: int
+    offset: int
+    expires_at: datetime
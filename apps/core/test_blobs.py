@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.blobs import get_blob_name, release_blobs, store_blob, store_blobs
+from core.models import Blob
+
+
+@pytest.mark.django_db
+def test_store_blob_deduplicates():
+    first = store_blob(ContentFile(b'content'), 'txt')
+    second = store_blob(ContentFile(b'content'), 'txt')
+    other = store_blob(ContentFile(b'other content'), 'txt')
+
+    assert first == second != other
+    assert first.startswith('blobs/') and first.count('/') == 3
+    assert first == get_blob_name(first.rsplit('/', 1)[1].split('.')[0], 'txt')
+    with default_storage.open(first) as file:
+        assert file.read() == b'content'
+    assert Blob.objects.get(name=first).references == 2
+
+    release_blobs([first, 'images/accounts/user/legacy.png'])
+
+    blob = Blob.objects.get(name=first)
+    assert (blob.references, blob.released_at) == (1, None)
+
+    release_blobs([first])
+
+    assert Blob.objects.get(name=first).released_at is not None
+
+
+@pytest.mark.django_db
+def test_store_blobs_in_one_query(django_assert_num_queries):
+    store_blob(ContentFile(b'existing'), 'txt')
+    files = [(ContentFile(b'existing'), 'txt'), (ContentFile(b'new'), 'txt'), (ContentFile(b'new'), 'txt')]
+
+    with django_assert_num_queries(1):
+        existing, new, same = store_blobs(files)
+
+    assert new == same
+    assert Blob.objects.get(name=existing).references == 2
+    assert Blob.objects.get(name=new).references == 2
+
+
+@pytest.mark.django_db
+def test_collect_blobs(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    kept = store_blob(ContentFile(b'kept'), 'txt')
+    released = store_blob(ContentFile(b'released'), 'txt')
+    recent = store_blob(ContentFile(b'recently released'), 'txt')
+    release_blobs([released, recent])
+    Blob.objects.filter(name=released).update(released_at=timezone.now() - timedelta(hours=2))
+    orphan = default_storage.save(get_blob_name('ff' * 20, 'txt'), ContentFile(b'orphan'))
+
+    out = StringIO()
+    call_command('collect_blobs', grace=3600, stdout=out)
+
+    assert 'unreferenced files deleted: 1' in out.getvalue()
+    assert not default_storage.exists(released)
+    assert not Blob.objects.filter(name=released).exists()
+    assert all(default_storage.exists(name) for name in (kept, recent, orphan))
+
+    call_command('collect_blobs', grace=0, orphans=True, stdout=out)
+
+    assert 'orphaned files deleted: 1' in out.getvalue()
+    assert not default_storage.exists(orphan)
+    assert not default_storage.exists(recent)
+    assert default_storage.exists(kept)
@@ -0,0 +1,42 @@
+import pytest
+
+from django.db import connection
+from django.urls import reverse
+
+from core.db import database_stats
+
+
+@pytest.mark.django_db
+def test_database_stats():
+    stats = database_stats()
+
+    assert stats['alias'] == 'default'
+    assert stats['conn_health_checks'] is True
+    if not stats['pooled']:
+        assert stats['pool'] == {}
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+    stats = database_stats()
+    assert stats['conn_max_age'] == 0
+    assert stats['pool']['pool_min'] <= stats['pool']['pool_size'] <= stats['pool']['pool_max']
+    assert stats['pool']['requests_num'] >= 1
+
+
+@pytest.mark.django_db
+def test_database_stats_api(logged_in):
+    url = reverse('api:database_stats')
+
+    response = logged_in.client.request('get', url)
+
+    assert response.status_code == 401
+
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+
+    response = logged_in.client.request('get', url)
+
+    assert response.status_code == 200
+    assert 'default' in [item['alias'] for item in response.json()]
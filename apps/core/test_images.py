@@ -0,0 +1,56 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from core.images import InvalidImage, make_variants, normalize_image, probe_image
+from core.testing import create_image
+
+
+def test_probe_image_reads_header_only():
+    info = probe_image(create_image(size=(300, 200)), formats=('PNG',), max_pixels=100_000)
+
+    assert (info.format, info.width, info.height) == ('PNG', 300, 200)
+
+
+@pytest.mark.parametrize('data, formats, max_pixels', [
+    (BytesIO(b'not an image'), ('PNG',), 100_000),
+    (create_image(image_format='GIF'), ('JPEG', 'PNG'), 100_000),
+    (create_image(size=(300, 200)), ('PNG',), 300 * 200 - 1),
+])
+def test_probe_image_rejects(data, formats, max_pixels):
+    with pytest.raises(InvalidImage):
+        probe_image(data, formats=formats, max_pixels=max_pixels)
+
+
+def test_normalize_image():
+    source = BytesIO()
+    image = Image.new('RGB', (400, 200))
+    exif = image.getexif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    image.save(source, 'JPEG', exif=exif)
+
+    content, extension = normalize_image(source, max_dimension=100)
+
+    assert extension == 'jpg'
+    with Image.open(BytesIO(content)) as normalized:
+        assert normalized.size == (50, 100)
+        assert not normalized.getexif()
+
+    content, extension = normalize_image(create_image(image_mode='RGBA'), max_dimension=100)
+
+    assert extension == 'png'
+
+
+def test_make_variants():
+    image = create_image(size=(300, 100), image_mode='RGBA')
+
+    variants = make_variants(image, sizes=(64, 512), formats=('WEBP', 'JPEG'))
+
+    assert set(variants) == {64, 512}
+    assert set(variants[64]) == {'webp', 'jpg'}
+    with Image.open(BytesIO(variants[64]['webp'])) as thumbnail:
+        assert (thumbnail.size, thumbnail.mode) == ((64, 64), 'RGBA')
+    with Image.open(BytesIO(variants[512]['jpg'])) as thumbnail:
+        # cropped square, never upscaled
+        assert (thumbnail.size, thumbnail.mode) == ((100, 100), 'RGB')
@@ -0,0 +1,93 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from accounts.factory import UserFactory
+from core.blobs import store_blob
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def read(response) -> bytes:
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_serve_blob(client, media_root):
+    name = store_blob(ContentFile(b'0123456789'), 'txt')
+    url = f'/media/{name}'
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert read(response) == b'0123456789'
+    assert response['Content-Type'].startswith('text/plain')
+    assert response['Accept-Ranges'] == 'bytes'
+    assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    etag = response['ETag']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+    response = client.get(url, headers={'Range': 'bytes=2-4'})
+    assert response.status_code == 206
+    assert read(response) == b'234'
+    assert (response['Content-Range'], response['Content-Length']) == ('bytes 2-4/10', '3')
+
+    response = client.get(url, headers={'Range': 'bytes=-3'})
+    assert read(response) == b'789'
+
+    response = client.get(url, headers={'Range': 'bytes=20-'})
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */10'
+
+    # the file changed since the client's partial copy, it gets all of it
+    response = client.get(url, headers={'Range': 'bytes=2-4', 'If-Range': '"stale"'})
+    assert response.status_code == 200
+    assert read(response) == b'0123456789'
+
+    assert client.post(url).status_code == 405
+
+
+@pytest.mark.django_db
+def test_serve_protected_media(client, media_root):
+    name = default_storage.save('exports/accounts.csv', ContentFile(b'email\n'))
+
+    assert client.get(f'/media/{name}').status_code == 404
+    assert client.get('/media/exports/missing.csv').status_code == 404
+    assert client.get('/media/blobs/../../../etc/passwd').status_code == 404
+    assert client.get(f'/media/blobs/../{name}').status_code == 404
+    assert client.get(f'/media/images/../blobs/../{name}').status_code == 404
+
+    client.force_login(UserFactory(is_staff=True))
+    response = client.get(f'/media/{name}')
+
+    assert response.status_code == 200
+    assert read(response) == b'email\n'
+    assert response['Cache-Control'] == 'private, no-cache'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('backend, header, value', [
+    ('nginx', 'X-Accel-Redirect', '/protected-media/{name}'),
+    ('sendfile', 'X-Sendfile', '{root}/{name}'),
+])
+def test_serve_media_offloaded(client, media_root, settings, backend, header, value):
+    settings.MEDIA_SERVING = {**settings.MEDIA_SERVING, 'BACKEND': backend}
+    name = store_blob(ContentFile(b'content'), 'png')
+
+    response = client.get(f'/media/{name}')
+
+    assert response.status_code == 200
+    assert response[header] == value.format(root=media_root, name=name)
+    assert response['Content-Type'] == 'image/png'
+    assert response.content == b''
+
+    response = client.get(f'/media/images/../{name}')
+
+    assert response[header] == value.format(root=media_root, name=name)
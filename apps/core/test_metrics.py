@@ -0,0 +1,66 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from .metrics import Histogram, metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def test_histogram():
+    histogram = Histogram('latency_seconds', 'Latency.', (0.1, 1.0), labels=('operation',))
+    histogram.observe(('a"b',), 0.05)
+    histogram.observe(('a"b',), 0.5)
+    histogram.observe(('a"b',), 5)
+
+    assert histogram.render() == [
+        '# HELP latency_seconds Latency.',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{operation="a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{operation="a\\"b",le="1.0"} 2',
+        'latency_seconds_bucket{operation="a\\"b",le="+Inf"} 3',
+        'latency_seconds_sum{operation="a\\"b"} 5.55',
+        'latency_seconds_count{operation="a\\"b"} 3',
+    ]
+
+
+@pytest.mark.django_db
+def test_metrics_middleware(logged_in, client, settings):
+    response = logged_in.client.request('get', reverse('api:user_profile'))
+
+    assert response.status_code == 200
+    assert response['Server-Timing'].startswith('app;dur=')
+    assert 'db;dur=' in response['Server-Timing']
+    assert ' queries"' in response['Server-Timing']
+
+    # never served without a token outside development
+    assert client.get(reverse('metrics')).status_code == 404
+
+    settings.METRICS = {**settings.METRICS, 'TOKEN': 'secret'}
+    response = client.get(reverse('metrics'), headers={'Authorization': 'Bearer secret'})
+
+    assert response.status_code == 200
+    body = response.content.decode()
+    labels = 'operation="api:user_profile",method="GET",status="200"'
+    assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+    assert f'http_request_db_queries_count{{{labels}}} 1' in body
+    assert f'http_request_db_queries_bucket{{{labels},le="0"}} 0' in body
+    assert f'http_response_size_bytes_count{{{labels}}} 1' in body
+
+    assert client.get(reverse('metrics')).status_code == 401
+    assert client.get(reverse('metrics'), headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_metrics_middleware_async(logged_in, async_client):
+    headers = {'Authorization': f'Bearer {logged_in.client.bearer}'}
+    response = async_to_sync(async_client.get)(reverse('api:user_profile'), headers=headers)
+
+    assert response.status_code == 200
+    # queries run by `sync_to_async` threads are counted
+    assert 'desc="0 queries"' not in response['Server-Timing']
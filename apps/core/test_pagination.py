@@ -0,0 +1,108 @@
+import base64
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from ninja.errors import ValidationError
+
+from accounts.factory import UserFactory
+from accounts.models import User
+from .pagination import CursorPagination
+
+
+def paginate(paginator, queryset, **kwargs):
+    return paginator.paginate_queryset(queryset, CursorPagination.Input(**kwargs))
+
+
+@pytest.mark.django_db
+def test_cursor_pagination():
+    users = sorted(UserFactory.create_batch(size=5), key=lambda u: u.id)
+    paginator = CursorPagination()
+    queryset = User.objects.all()
+
+    page = paginate(paginator, queryset, limit=2)
+    assert page['items'] == users[:2]
+    assert page['previous'] is None
+    assert page['count'] is None
+
+    page = paginate(paginator, queryset, limit=2, cursor=page['next'])
+    assert page['items'] == users[2:4]
+
+    last = paginate(paginator, queryset, limit=2, cursor=page['next'])
+    assert last['items'] == users[4:]
+    assert last['next'] is None
+
+    page = paginate(paginator, queryset, limit=2, cursor=last['previous'])
+    assert page['items'] == users[2:4]
+
+    page = paginate(paginator, queryset, limit=2, cursor=page['previous'])
+    assert page['items'] == users[:2]
+    assert page['previous'] is None
+    assert page['next'] is not None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_composite_ordering():
+    UserFactory(email='b@example.com')
+    UserFactory(email='a@example.com')
+    UserFactory(email='c@example.com')
+    paginator = CursorPagination(ordering=('email', 'id'))
+
+    page = paginate(paginator, User.objects.all(), limit=2, estimate_count=True)
+    assert [u.email for u in page['items']] == ['a@example.com', 'b@example.com']
+    assert page['count'] == 3
+
+    page = paginate(paginator, User.objects.all(), limit=2, cursor=page['next'])
+    assert [u.email for u in page['items']] == ['c@example.com']
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_invalid_cursor():
+    with pytest.raises(ValidationError):
+        paginate(CursorPagination(), User.objects.all(), cursor='invalid')
+
+
+def encode(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('ordering, values', [
+    (('id',), ['x']),
+    (('id',), [None]),
+    (('id',), [{'id': 1}]),
+    (('date_joined', 'id'), ['yesterday', 1]),
+])
+def test_cursor_pagination_tampered_cursor(ordering, values):
+    with pytest.raises(ValidationError):
+        paginate(CursorPagination(ordering=ordering), User.objects.all(), cursor=encode({'v': values, 'r': False}))
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_tampered_cursor_api(logged_in):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+
+    response = logged_in.client.request(
+        'get', reverse('api:get_accounts'), payload={'cursor': encode({'v': ['x'], 'r': False})},
+    )
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == 'cursor is not valid.'
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_async():
+    users = sorted(UserFactory.create_batch(size=3), key=lambda u: u.id)
+    paginator = CursorPagination()
+    apaginate = async_to_sync(paginator.apaginate_queryset)
+
+    page = apaginate(User.objects.all(), CursorPagination.Input(limit=2, estimate_count=True))
+    assert page['items'] == users[:2]
+    assert page['count'] == 3
+
+    page = apaginate(User.objects.all(), CursorPagination.Input(limit=2, cursor=page['next']))
+    assert page['items'] == users[2:]
+    assert page['next'] is None
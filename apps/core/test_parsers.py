@@ -0,0 +1,17 @@
+import pytest
+
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+def test_orjson_parser(client):
+    url = reverse('api:forgot_password')
+
+    response = client.post(url, '{"email": "user@example.com"}', content_type='application/json')
+
+    assert response.status_code == 200
+
+    response = client.post(url, '{"email": ', content_type='application/json')
+
+    assert response.status_code == 400
+    assert response.json()['detail'].startswith('Cannot parse request body')
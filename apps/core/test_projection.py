@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factory import UserFactory
+from accounts.models import User
+from accounts.schemas import AccountResponse, UserProfileResponse
+from .pagination import CursorPagination
+from .projection import get_schema_columns, project
+
+
+def test_get_schema_columns():
+    assert get_schema_columns(AccountResponse, User) == ('id', 'email', 'first_name', 'last_name')
+    assert get_schema_columns(UserProfileResponse, User) == (
+        'avatar', 'avatar_variants', 'email', 'first_name', 'last_name', 'is_verified',
+    )
+
+
+@pytest.mark.django_db
+def test_project():
+    user = UserFactory()
+
+    with CaptureQueriesContext(connection) as queries:
+        row = project(User.objects.all(), AccountResponse, values=True).get()
+    assert 'password' not in queries[0]['sql']
+    assert row == {'id': user.id, 'email': user.email, 'first_name': user.first_name, 'last_name': user.last_name}
+    assert AccountResponse.model_validate(row).id == user.id
+
+    instance = project(User.objects.all(), UserProfileResponse, 'id').get()
+    assert instance.get_deferred_fields() >= {'password', 'date_joined', 'updated_at'}
+    assert 'id' not in instance.get_deferred_fields()
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_values():
+    users = sorted(UserFactory.create_batch(size=3), key=lambda u: u.id)
+    paginator = CursorPagination()
+    queryset = project(User.objects.all(), AccountResponse, values=True)
+
+    page = paginator.paginate_queryset(queryset, CursorPagination.Input(limit=2))
+    assert [row['id'] for row in page['items']] == [u.id for u in users[:2]]
+
+    page = paginator.paginate_queryset(queryset, CursorPagination.Input(limit=2, cursor=page['next']))
+    assert [row['id'] for row in page['items']] == [users[2].id]
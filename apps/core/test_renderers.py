@@ -0,0 +1,34 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.utils.translation import gettext_lazy
+
+from accounts.schemas import AccountResponse
+from core.renderers import ORJSONRenderer
+
+
+def test_orjson_renderer():
+    value = uuid.uuid4()
+    data = {
+        'uuid': value,
+        'datetime': datetime.datetime(2024, 5, 1, 12, 30, 15, tzinfo=datetime.UTC),
+        'date': datetime.date(2024, 5, 1),
+        'decimal': Decimal('1.10'),
+        'lazy': gettext_lazy('text'),
+        1: 'non-str key',
+        'items': [AccountResponse(id=1, email='user@example.com')],
+    }
+
+    rendered = json.loads(ORJSONRenderer().render(None, data, response_status=200))
+
+    assert rendered == {
+        'uuid': str(value),
+        'datetime': '2024-05-01T12:30:15+00:00',
+        'date': '2024-05-01',
+        'decimal': '1.10',
+        'lazy': 'text',
+        '1': 'non-str key',
+        'items': [{'id': 1, 'email': 'user@example.com', 'first_name': None, 'last_name': None}],
+    }
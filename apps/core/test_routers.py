@@ -0,0 +1,62 @@
+import pytest
+
+from django.db import connections
+from django.urls import reverse
+
+from accounts.factory import UserFactory
+from accounts.models import User
+from core import routers
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_ROUTING = {**settings.DATABASE_ROUTING, 'REPLICAS': ['replica']}
+    routers._lag_cache.clear()
+    yield 'replica'
+    routers._lag_cache.clear()
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_choose_read_alias(replica, settings):
+    assert routers.choose_read_alias() == replica
+
+    routers.pin_to_primary(1)
+    assert routers.choose_read_alias(1) == 'default'
+    assert routers.choose_read_alias(2) == replica
+
+    routers._lag_cache.set(replica, 60.0)
+    assert routers.choose_read_alias(2) == 'default'
+
+    settings.DATABASE_ROUTING = {**settings.DATABASE_ROUTING, 'REPLICAS': []}
+    assert routers.choose_read_alias() == 'default'
+
+
+@pytest.mark.django_db(databases=['default', 'replica'], transaction=True)
+def test_read_replica_view(replica, logged_in, django_assert_num_queries):
+    logged_in.user.is_superuser = True
+    logged_in.user.save()
+    UserFactory.create_batch(size=2)
+    routers.get_pin_cache().clear()
+
+    url = reverse('api:get_accounts')
+    with django_assert_num_queries(1, connection=connections[replica]):
+        response = logged_in.client.request('get', url)
+
+    assert response.status_code == 200
+    assert len(response.json()['items']) == 2
+
+    # writing the account pins the user to the primary
+    User.objects.filter(pk=logged_in.user.pk).first().save()
+    with django_assert_num_queries(0, connection=connections[replica]):
+        response = logged_in.client.request('get', url)
+
+    assert response.status_code == 200
+
+
+def test_router_never_migrates_replicas(replica):
+    router = routers.ReplicaRouter()
+
+    assert router.allow_migrate(replica, 'accounts') is False
+    assert router.allow_migrate('default', 'accounts') is None
+    assert router.db_for_write(User) is None
+    assert router.db_for_read(User) is None
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from accounts.factory import UserFactory
+from core.models import UploadSession
+from core.testing import checksum
+from core.uploads import InvalidChunk, append_chunk, create_session, get_path, open_session
+
+
+@pytest.mark.django_db
+def test_upload_checksum_mismatch():
+    session = create_session(UserFactory(), 4, checksum(b'data'))
+    append_chunk(session, 0, BytesIO(b'da'), 2)
+    append_chunk(session, 2, BytesIO(b'ta'), 2)
+
+    with open_session(UploadSession.objects.get(pk=session.pk)) as file:
+        assert file.read() == b'data'
+
+    session = create_session(UserFactory(), 4, checksum(b'data'))
+    append_chunk(session, 0, BytesIO(b'date'), 4)
+
+    with pytest.raises(InvalidChunk, match='upload checksum mismatch'):
+        open_session(UploadSession.objects.get(pk=session.pk))
+
+
+@pytest.mark.django_db
+def test_truncated_chunk_is_discarded():
+    session = create_session(UserFactory(), 4)
+
+    with pytest.raises(InvalidChunk, match='chunk ended after 2 of 4 bytes'):
+        append_chunk(session, 0, BytesIO(b'da'), 4)
+
+    session.refresh_from_db()
+    assert session.offset == 0
+    with open(get_path(session), 'rb') as file:
+        assert file.read() == b''
+
+
+@pytest.mark.django_db
+def test_expire_uploads():
+    user = UserFactory()
+    expired = create_session(user, 10)
+    UploadSession.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+    active = create_session(user, 10)
+
+    out = StringIO()
+    call_command('expire_uploads', stdout=out)
+
+    assert 'expired upload sessions deleted: 1' in out.getvalue()
+    assert list(UploadSession.objects.all()) == [active]
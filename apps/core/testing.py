@@ -1,6 +1,16 @@
+import base64
+import contextlib
+import hashlib
+import re
 import types
+from collections import Counter
 
+import pytest
 from PIL import Image
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 from io import BytesIO
 
@@ -15,6 +25,36 @@ def create_image(size: tuple = (100, 100), image_mode: str = 'RGB', image_format
     return data
 
 
+def checksum(data: bytes, algorithm: str = 'sha256') -> str:
+    """
+    `Upload-Checksum` of `data`
+    """
+    return f'{algorithm} {base64.b64encode(hashlib.new(algorithm, data).digest()).decode()}'
+
+
+def send_chunk(client, upload_id, offset: int, data: bytes, **headers):
+    """
+    PATCH one chunk of an avatar upload session at `offset`
+    """
+    return client.request(
+        'patch', reverse('api:avatar_upload_chunk', kwargs={'upload_id': upload_id}), payload=data,
+        content_type='application/offset+octet-stream', headers={'Upload-Offset': str(offset), **headers},
+    )
+
+
+def read_stream(response) -> str:
+    """
+    Body of a streaming response, sync or async
+    """
+    if not response.is_async:
+        return b''.join(response.streaming_content).decode()
+
+    async def consume():
+        return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+    return async_to_sync(consume)()
+
+
 def response(status_code: int, content: any) -> types.SimpleNamespace:
     """
     Generate a simple response object
@@ -28,3 +68,33 @@ def response(status_code: int, content: any) -> types.SimpleNamespace:
     obj.content = content
 
     return obj
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    SQL with literals replaced, so repeats of one statement compare equal.
+    """
+    return re.sub(r"'(?:[^']|'')*'|\b\d+\b", '?', sql)
+
+
+@contextlib.contextmanager
+def query_budget(max_queries: int, using: str = 'default'):
+    """
+    Fail the test when the block runs more than `max_queries` queries.
+    The report lists every query, the ones over budget are marked `+`
+    and statements run repeatedly (a likely N+1) are counted.
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    executed = [query['sql'] for query in context.captured_queries]
+    if len(executed) <= max_queries:
+        return
+
+    repeats = Counter(normalize_sql(sql) for sql in executed)
+    lines = [f'--- budget: {max_queries} queries', f'+++ executed: {len(executed)} queries']
+    for i, sql in enumerate(executed):
+        count = repeats[normalize_sql(sql)]
+        note = f'  [x{count}]' if count > 1 else ''
+        lines.append(f'{"+" if i >= max_queries else " "} {i + 1}. {sql}{note}')
+    pytest.fail('\n'.join(lines), pytrace=False)
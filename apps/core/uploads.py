@@ -0,0 +1,172 @@
+import base64
+import binascii
+import hashlib
+import os
+from datetime import timedelta
+from typing import IO
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files import uploadhandler
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import UploadSession
+
+__all__ = (
+    'InvalidChunk',
+    'OffsetConflict',
+    'TemporaryFileUploadHandler',
+    'append_chunk',
+    'create_session',
+    'delete_session',
+    'expire_sessions',
+    'open_session',
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class TemporaryFileUploadHandler(uploadhandler.TemporaryFileUploadHandler):
+    """
+    Streams every uploaded file to a temporary file chunk by chunk, so
+    uploads never sit in worker memory, and rejects a file as soon as it
+    grows past `UPLOADS['MAX_FILE_SIZE']` instead of once fully received.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        max_size = settings.UPLOADS['MAX_FILE_SIZE']
+        if start + len(raw_data) > max_size:
+            self.upload_interrupted()
+            raise RequestDataTooBig(f'Uploaded file exceeds {max_size} bytes.')
+        return super().receive_data_chunk(raw_data, start)
+
+
+class InvalidChunk(ValueError):
+    pass
+
+
+class OffsetConflict(ValueError):
+    def __init__(self, offset: int):
+        super().__init__(f'upload is at offset {offset}')
+        self.offset = offset
+
+
+def parse_checksum(value: str) -> tuple[str, bytes]:
+    """
+    `<algorithm> <base64 digest>`, as in tus' `Upload-Checksum` header.
+    """
+    algorithm, _, digest = value.strip().partition(' ')
+    if algorithm not in settings.UPLOADS['CHECKSUM_ALGORITHMS']:
+        raise InvalidChunk(f'unsupported checksum algorithm: {algorithm}')
+    try:
+        return algorithm, base64.b64decode(digest, validate=True)
+    except binascii.Error as e:
+        raise InvalidChunk('checksum is not valid base64') from e
+
+
+def get_path(session: UploadSession) -> str:
+    return os.path.join(settings.UPLOADS['SESSION_ROOT'], f'{session.id}.part')
+
+
+def create_session(user, size: int, checksum: str = '') -> UploadSession:
+    """
+    Start a resumable upload of `size` bytes, optionally with the checksum
+    of the whole file, and create its empty file.
+    """
+    if checksum:
+        parse_checksum(checksum)
+
+    ttl = timedelta(seconds=settings.UPLOADS['SESSION_TTL'])
+    session = UploadSession.objects.create(user=user, size=size, checksum=checksum, expires_at=timezone.now() + ttl)
+    os.makedirs(settings.UPLOADS['SESSION_ROOT'], exist_ok=True)
+    open(get_path(session), 'wb').close()
+    return session
+
+
+def append_chunk(session: UploadSession, offset: int, stream: IO[bytes], length: int, checksum: str = '') -> int:
+    """
+    Append `length` bytes read from `stream` at `offset`, which must be where
+    the upload currently ends. The chunk is copied to disk in small pieces,
+    never held in memory, and kept only if it arrived whole and matches
+    `checksum`, so clients resend from the last acknowledged offset.
+    Returns the new offset.
+    """
+    algorithm, expected = parse_checksum(checksum) if checksum else (None, None)
+
+    with transaction.atomic():
+        # serializes chunks sent concurrently to the same upload
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if offset != session.offset:
+            raise OffsetConflict(session.offset)
+        if offset + length > session.size:
+            raise InvalidChunk(f'chunk exceeds the upload size of {session.size} bytes')
+
+        digest = hashlib.new(algorithm) if algorithm else None
+        received = 0
+        with open(get_path(session), 'r+b') as file:
+            file.truncate(offset)
+            file.seek(offset)
+            while received < length:
+                data = stream.read(min(CHUNK_SIZE, length - received))
+                if not data:
+                    break
+                file.write(data)
+                received += len(data)
+                if digest is not None:
+                    digest.update(data)
+
+            if received != length:
+                file.truncate(offset)
+                raise InvalidChunk(f'chunk ended after {received} of {length} bytes')
+            if digest is not None and digest.digest() != expected:
+                file.truncate(offset)
+                raise InvalidChunk('chunk checksum mismatch')
+
+        session.offset += length
+        session.save(update_fields=['offset'])
+
+    return session.offset
+
+
+def open_session(session: UploadSession) -> UploadedFile:
+    """
+    The completed upload as a file, once all bytes arrived and the
+    checksum of the whole file, when given, matches.
+    """
+    if session.offset != session.size:
+        raise InvalidChunk(f'upload is incomplete: {session.offset} of {session.size} bytes')
+
+    file = UploadedFile(open(get_path(session), 'rb'), name=f'{session.id}', size=session.size)
+    if session.checksum:
+        algorithm, expected = parse_checksum(session.checksum)
+        digest = hashlib.new(algorithm)
+        for data in file.chunks(CHUNK_SIZE):
+            digest.update(data)
+        file.seek(0)
+        if digest.digest() != expected:
+            file.close()
+            raise InvalidChunk('upload checksum mismatch')
+    return file
+
+
+def delete_session(session: UploadSession):
+    try:
+        os.remove(get_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def expire_sessions() -> int:
+    """
+    Delete abandoned uploads past their expiry along with their files.
+    Returns how many were deleted.
+    """
+    expired = UploadSession.objects.filter(expires_at__lt=timezone.now())
+    count = 0
+    for session in expired.iterator():
+        delete_session(session)
+        count += 1
+    return count
@@ -1,3 +1,5 @@
+from collections.abc import Iterable, Iterator
+
 from django.conf import settings
 
 
@@ -10,3 +12,14 @@ def build_client_absolute_url(path: str) -> str:
         domain=domain,
         path=path,
     )
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
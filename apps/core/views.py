@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+
+from core.media import serve_media
+from core.metrics import metrics
+
+
+def metrics_view(request):
+    """
+    Request metrics of this process in the Prometheus text format.
+    Requires `Authorization: Bearer <METRICS_TOKEN>`, only served
+    without a token when `DEBUG` is on.
+    """
+    token = settings.METRICS['TOKEN']
+    if not token and not settings.DEBUG:
+        raise Http404
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_safe
+def media_view(request, path):
+    """
+    Media files, authorized here and sent by the web server when
+    `MEDIA_SERVING_BACKEND` is `nginx` or `sendfile`, see `core.media`.
+    """
+    return serve_media(request, path)
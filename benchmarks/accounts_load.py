@@ -0,0 +1,198 @@
+"""
+Load test of the accounts API: signup, token pair, token refresh,
+profile and users list traffic at one or more concurrency levels.
+
+    python -m benchmarks.accounts_load --users 10000 --concurrency 1 16 64 --output results.json
+    python -m benchmarks.accounts_load --compare results.json --output after.json
+
+Runs against DATABASE_URL when set (e.g. a local Postgres), a temporary
+sqlite database otherwise. Seeded users are kept between runs on the
+same database, only the missing ones are created.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import uuid
+
+from benchmarks.common import BASE_DIR, configure, free_port, json_request, print_table, run_load, serve
+
+PASSWORD = 'benchmark-password'
+EMAIL = 'load-{}@example.com'
+SEED_BATCH_SIZE = 1000
+# users sampled for the token routes, tokens are minted before the run
+TOKEN_USERS = 100
+
+SCENARIOS = ('signup', 'auth_pair', 'auth_refresh', 'profile', 'users')
+
+
+def seed(users: int) -> dict:
+    """
+    Create `users` accounts with `UserFactory`, all sharing one password
+    hashed once, and mint the tokens the scenarios send.
+    """
+    from django.contrib.auth.hashers import make_password
+    from ninja_jwt.tokens import RefreshToken
+
+    from accounts.factory import UserFactory
+    from accounts.models import User
+
+    password = make_password(PASSWORD)
+    for start in range(0, users, SEED_BATCH_SIZE):
+        emails = [EMAIL.format(i) for i in range(start, min(start + SEED_BATCH_SIZE, users))]
+        existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        missing = [email for email in emails if email not in existing]
+        if not missing:
+            continue
+
+        # every scenario picks users by index, so seeded emails must have no gaps
+        batch = UserFactory.build_batch(size=len(missing), password=password)
+        for user, email in zip(batch, missing, strict=True):
+            user.email = email
+        User.objects.bulk_create(batch, ignore_conflicts=True)
+
+    admin, _ = User.objects.get_or_create(
+        email='load-admin@example.com',
+        defaults={'is_superuser': True, 'is_staff': True},
+    )
+    sample = User.objects.filter(email__startswith='load-').exclude(pk=admin.pk).order_by('pk')[:TOKEN_USERS]
+    refresh = [RefreshToken.for_user(user) for user in sample]
+    return {
+        'admin': str(RefreshToken.for_user(admin).access_token),
+        'access': [str(token.access_token) for token in refresh],
+        'refresh': [str(token) for token in refresh],
+    }
+
+
+def scenarios(users: int, tokens: dict) -> dict:
+    """
+    Request factories per scenario, `make(i)` builds the i-th request.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    # warm up requests sign up too, so emails come from a shared counter
+    signups = itertools.count()
+
+    def signup(_):
+        email = f'load-signup-{run_id}-{next(signups)}@example.com'
+        return json_request('POST', '/api/accounts/signup/', {'email': email, 'password': PASSWORD})
+
+    def auth_pair(i):
+        payload = {'email': EMAIL.format(i % users), 'password': PASSWORD}
+        return json_request('POST', '/api/accounts/auth/pair/', payload)
+
+    def auth_refresh(i):
+        refresh = tokens['refresh'][i % len(tokens['refresh'])]
+        return json_request('POST', '/api/accounts/auth/refresh/', {'refresh': refresh})
+
+    def profile(i):
+        return json_request('GET', '/api/accounts/', token=tokens['access'][i % len(tokens['access'])])
+
+    def users_list(_):
+        return json_request('GET', '/api/accounts/users/?limit=100', token=tokens['admin'])
+
+    return {
+        'signup': signup,
+        'auth_pair': auth_pair,
+        'auth_refresh': auth_refresh,
+        'profile': profile,
+        'users': users_list,
+    }
+
+
+def server_command(server: str, port: int, workers: int) -> list[str]:
+    if server == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'project.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'project.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+        '--log-level', 'warning', '--no-access-log',
+    ]
+
+
+def describe_run(args) -> dict:
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'started': datetime.datetime.now(datetime.UTC).isoformat(timespec='seconds'),
+        'commit': commit,
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'args': {key: value for key, value in vars(args).items() if key not in ('database_url', 'compare')},
+    }
+
+
+def compare(results: list[dict], baseline: list[dict]) -> list[dict]:
+    """
+    Relative change of throughput and latencies against a previous run,
+    matched by scenario and concurrency.
+    """
+    previous = {(row['scenario'], row['concurrency']): row for row in baseline}
+    rows = []
+    for row in results:
+        before = previous.get((row['scenario'], row['concurrency']))
+        if before is None:
+            continue
+
+        changes = {}
+        for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            if before.get(key) and row.get(key) is not None:
+                changes[key] = f'{(row[key] - before[key]) / before[key]:+.1%}'
+        rows.append({'scenario': row['scenario'], 'concurrency': row['concurrency'], **changes})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=2000, help='requests per scenario and concurrency')
+    parser.add_argument('--users', type=int, default=10_000, help='seeded users')
+    parser.add_argument('--server', choices=('asgi', 'wsgi'), default='asgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--database-url')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    args = parser.parse_args()
+
+    env = configure(args.database_url)
+    env['EMAIL_BACKEND'] = 'django.core.mail.backends.dummy.EmailBackend'
+    tokens = seed(args.users)
+    requests = scenarios(args.users, tokens)
+
+    port = free_port()
+    results = []
+    with serve(server_command(args.server, port, args.workers), env, port):
+        for scenario in args.scenarios:
+            make_request = requests[scenario]
+            run_load(port, make_request, min(args.requests, 100), max(args.concurrency))  # warm up
+            for concurrency in args.concurrency:
+                stats = run_load(port, make_request, args.requests, concurrency)
+                results.append({'scenario': scenario, 'concurrency': concurrency, **stats})
+
+    print_table(results, ['scenario', 'concurrency', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'errors'])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({**describe_run(args), 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            changes = compare(results, json.load(f)['results'])
+        if changes:
+            print()
+            print_table(changes, ['scenario', 'concurrency', 'rps', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Helpers shared by the benchmark scripts: configure Django against the
+benchmark database, boot servers and drive HTTP load from threads.
+"""
+import contextlib
+import http.client
+import json
+import os
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def configure(database_url: str | None = None) -> dict:
+    """
+    Point this process at the benchmark database, migrate it and
+    return the environment the servers should run with.
+    """
+    if database_url is None:
+        database_url = os.environ.get('DATABASE_URL')
+    if database_url is None:
+        database_url = 'sqlite:///{}'.format(Path(tempfile.mkdtemp()) / 'benchmark.sqlite3')
+
+    paths = [str(BASE_DIR), str(BASE_DIR / 'apps')]
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'project.settings',
+        'DEBUG': 'False',
+        'ALLOWED_HOSTS': '*',
+        'LOG_LEVEL': 'WARNING',
+        'DATABASE_URL': database_url,
+        # /metrics requires a token with DEBUG off
+        'METRICS_TOKEN': os.environ.get('METRICS_TOKEN') or secrets.token_urlsafe(),
+        'PYTHONPATH': os.pathsep.join([*paths, os.environ.get('PYTHONPATH', '')]),
+    }
+    os.environ.update(env)
+    sys.path[:0] = paths
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(command: list[str], env: dict, port: int, timeout: float = 30):
+    """
+    Run a server until the block exits, waiting for it to accept connections.
+    """
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'{command[0]} exited with {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f'{command[0]} did not start in {timeout}s') from None
+                time.sleep(0.2)
+        yield
+    finally:
+        process.terminate()
+        process.wait(timeout=timeout)
+
+
+def run_load(port: int, make_request, total: int, concurrency: int) -> dict:
+    """
+    Send `total` requests from `concurrency` threads, each on its own
+    keep-alive connection. `make_request(i)` returns
+    `(method, path, body, headers)` for the i-th request.
+    """
+    counter = iter(range(total))
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+
+            method, path, body, headers = make_request(i)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                errors.append(repr(e))
+                continue
+
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status >= 400:
+                    errors.append(response.status)
+        connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def summarize(latencies: list[float], errors: list, elapsed: float) -> dict:
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(cuts[49] * 1000, 2) if cuts else None,
+        'p95_ms': round(cuts[94] * 1000, 2) if cuts else None,
+        'p99_ms': round(cuts[98] * 1000, 2) if cuts else None,
+    }
+
+
+def json_request(method: str, path: str, payload: dict | None = None, token: str | None = None) -> tuple:
+    headers = {'Accept': 'application/json'}
+    body = None
+    if payload is not None:
+        body = json.dumps(payload)
+        headers['Content-Type'] = 'application/json'
+    if token is not None:
+        headers['Authorization'] = f'Bearer {token}'
+    return method, path, body, headers
+
+
+def print_table(rows: list[dict], columns: list[str]):
+    widths = {c: max(len(c), *(len(str(row.get(c))) for row in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row.get(c)).ljust(widths[c]) for c in columns))
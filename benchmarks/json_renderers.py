@@ -0,0 +1,102 @@
+"""
+Compare ninja's default JSON renderer and parser with the orjson ones
+the API uses, on a page of `AccountResponse` items and on a
+`TokenObtainPairResponse`.
+
+    python -m benchmarks.json_renderers --items 100 --number 2000
+
+Runs in-process, no server or database rows are needed.
+"""
+import argparse
+import json
+import timeit
+
+from benchmarks.common import configure, print_table
+
+
+def make_payloads(items: int) -> dict:
+    from ninja_jwt.tokens import RefreshToken
+
+    from accounts.models import User
+    from accounts.schemas import AccountResponse, TokenObtainPairResponse
+    from core.pagination import CursorPagination
+
+    users = [
+        User(id=i, email=f'benchmark-{i}@example.com', first_name='Bench', last_name=str(i))
+        for i in range(1, items + 1)
+    ]
+    page = CursorPagination.Output(
+        items=[AccountResponse.model_validate(user, from_attributes=True) for user in users],
+        next='eyJ2IjogWzEwMF0sICJyIjogZmFsc2V9',
+    )
+
+    user = users[0]
+    refresh = RefreshToken.for_user(user)
+    tokens = TokenObtainPairResponse.model_validate(
+        {'refresh': str(refresh), 'access': str(refresh.access_token), 'user': user},
+        from_attributes=True,
+    )
+
+    # operations hand renderers the dumped response schema
+    return {
+        f'accounts[{items}]': page.model_dump(),
+        'token_pair': tokens.model_dump(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100, help='accounts per page')
+    parser.add_argument('--number', type=int, default=2000, help='iterations per measurement')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    configure()
+
+    from ninja.parser import Parser
+    from ninja.renderers import JSONRenderer
+
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer
+
+    class Body:
+        def __init__(self, body: bytes):
+            self.body = body
+
+    implementations = {
+        'json': (JSONRenderer(), Parser()),
+        'orjson': (ORJSONRenderer(), ORJSONParser()),
+    }
+
+    results = []
+    for payload_name, data in make_payloads(args.items).items():
+        for name, (renderer, body_parser) in implementations.items():
+            body = renderer.render(None, data, response_status=200)
+            request = Body(body if isinstance(body, bytes) else body.encode())
+
+            render = min(timeit.repeat(
+                lambda renderer=renderer, data=data: renderer.render(None, data, response_status=200),
+                number=args.number,
+                repeat=5,
+            ))
+            parse = min(timeit.repeat(
+                lambda body_parser=body_parser, request=request: body_parser.parse_body(request),
+                number=args.number,
+                repeat=5,
+            ))
+            results.append({
+                'payload': payload_name,
+                'implementation': name,
+                'bytes': len(request.body),
+                'render_us': round(render / args.number * 1e6, 2),
+                'parse_us': round(parse / args.number * 1e6, 2),
+            })
+
+    print_table(results, ['payload', 'implementation', 'bytes', 'render_us', 'parse_us'])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare throughput of the accounts routes served by gunicorn (WSGI)
+and uvicorn (ASGI) with the same number of worker processes.
+
+    python -m benchmarks.wsgi_vs_asgi --workers 2 --concurrency 64 --requests 5000
+
+Runs against DATABASE_URL when set, a temporary sqlite database otherwise.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.common import configure, free_port, json_request, print_table, run_load, serve
+
+
+def seed(users: int) -> tuple[str, int]:
+    from ninja_jwt.tokens import RefreshToken
+
+    from accounts.models import User
+
+    User.objects.bulk_create(
+        [User(email=f'benchmark-{i}@example.com', first_name='Bench', last_name=str(i)) for i in range(users)],
+        ignore_conflicts=True,
+    )
+    admin, _ = User.objects.get_or_create(
+        email='benchmark-admin@example.com',
+        defaults={'is_superuser': True, 'is_staff': True},
+    )
+    return str(RefreshToken.for_user(admin).access_token), User.objects.exclude(pk=admin.pk).first().pk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--database-url')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    env = configure(args.database_url)
+    token, user_id = seed(args.users)
+
+    routes = {
+        'user_profile': json_request('GET', '/api/accounts/', token=token),
+        'get_user_profile': json_request('GET', f'/api/accounts/profile/{user_id}/', token=token),
+        'get_accounts': json_request('GET', '/api/accounts/users/?limit=100', token=token),
+    }
+
+    port = free_port()
+    servers = {
+        'wsgi': [
+            sys.executable, '-m', 'gunicorn', 'project.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers), '--threads', str(args.threads),
+            '--log-level', 'warning',
+        ],
+        'asgi': [
+            sys.executable, '-m', 'uvicorn', 'project.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(args.workers),
+            '--log-level', 'warning', '--no-access-log',
+        ],
+    }
+
+    results = []
+    for server, command in servers.items():
+        with serve(command, env, port):
+            for route, request in routes.items():
+                run_load(port, lambda _, request=request: request, min(args.requests, 100), args.concurrency)  # warm up
+                stats = run_load(port, lambda _, request=request: request, args.requests, args.concurrency)
+                results.append({'server': server, 'route': route, **stats})
+
+    print_table(results, ['server', 'route', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'errors'])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,16 @@ from ninja_jwt.tokens import RefreshToken
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from core.testing import create_image
+from core.testing import create_image, query_budget as query_budget_context
 from accounts.factory import UserFactory
+from accounts.authentication import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
 
 
 @pytest.fixture
@@ -63,6 +71,16 @@ class ClientWrapper:
         return method(url, payload, headers=headers, **kwargs)
 
 
+@pytest.fixture
+def query_budget() -> callable:
+    """
+    `with query_budget(2): ...` fails the test when the block
+    runs more than 2 queries, listing the SQL it executed.
+    :return: callable
+    """
+    return query_budget_context
+
+
 @pytest.fixture
 def image_file() -> callable:
     def create_image_file(filename='image.png', content_type='image/png'):
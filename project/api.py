@@ -1,13 +1,25 @@
 import logging
 
 from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
 from ninja import NinjaAPI
-from ninja_jwt.authentication import JWTAuth
 
 from accounts.api import accounts_router
-
-api = NinjaAPI(auth=JWTAuth(), urls_namespace='api', docs_url='/docs/')
+from accounts.authentication import AsyncCachedJWTAuth
+from accounts.hashing import HashingSaturated
+from core.api import core_router
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+api = NinjaAPI(
+    auth=AsyncCachedJWTAuth(),
+    urls_namespace='api',
+    docs_url='/docs/',
+    renderer=ORJSONRenderer(),
+    parser=ORJSONParser(),
+)
 api.add_router('accounts/', accounts_router)
+api.add_router('core/', core_router)
 
 logger = logging.getLogger('api')
 
@@ -25,3 +37,27 @@ def service_unavailable(request, exc):
 
 
 api.exception_handler(Exception)(service_unavailable)
+
+
+def hashing_saturated(request, exc):
+    response = api.create_response(
+        request,
+        {"message": "Service is busy, please retry."},
+        status=503,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+api.exception_handler(HashingSaturated)(hashing_saturated)
+
+
+def request_too_large(request, exc):
+    return api.create_response(
+        request,
+        {"message": str(exc)},
+        status=413,
+    )
+
+
+api.exception_handler(RequestDataTooBig)(request_too_large)
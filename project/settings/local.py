@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import ENV, BASE_DIR, PROJECT_DIR
 
 # Quick-start development settings - unsuitable for production
@@ -60,6 +62,20 @@ MIDDLEWARE = [
 if DEBUG:
     MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
 
+# Per-operation latency, query and response size metrics, served
+# at /metrics (bearer METRICS_TOKEN, required unless DEBUG), see core.middleware
+METRICS = {
+    'ENABLED': ENV.bool('METRICS_ENABLED', True),
+    'SERVER_TIMING': ENV.bool('METRICS_SERVER_TIMING', True),
+    'TOKEN': ENV.str('METRICS_TOKEN', None),
+}
+
+if METRICS['ENABLED'] and not METRICS['TOKEN'] and not DEBUG:
+    raise ImproperlyConfigured('METRICS_TOKEN is required when DEBUG is off, or set METRICS_ENABLED=False.')
+
+if METRICS['ENABLED']:
+    MIDDLEWARE.insert(0, 'core.middleware.MetricsMiddleware')
+
 ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
@@ -87,6 +103,67 @@ DATABASES = {
     'default': ENV.db_url('DATABASE_URL', default='sqlite://:memory:'),
 }
 
+# Connections are closed after every request by default: async views run the
+# ORM in sync_to_async threads, and persistent connections would be kept per
+# thread and leak. Production serves ASGI (uvicorn), DATABASE_CONN_MAX_AGE > 0
+# is only safe when serving WSGI.
+# With DATABASE_POOL_ENABLED Postgres connections are reused from a psycopg
+# pool instead, Django requires CONN_MAX_AGE = 0 in that mode.
+DATABASE_POOL = {
+    'ENABLED': ENV.bool('DATABASE_POOL_ENABLED', False),
+    'MIN_SIZE': ENV.int('DATABASE_POOL_MIN_SIZE', 2),
+    'MAX_SIZE': ENV.int('DATABASE_POOL_MAX_SIZE', 10),
+    'TIMEOUT': ENV.float('DATABASE_POOL_TIMEOUT', 10.0),
+    'MAX_IDLE': ENV.float('DATABASE_POOL_MAX_IDLE', 600.0),
+    'MAX_LIFETIME': ENV.float('DATABASE_POOL_MAX_LIFETIME', 3600.0),
+}
+
+DATABASES['default'].update(
+    CONN_MAX_AGE=ENV.int('DATABASE_CONN_MAX_AGE', 0),
+    CONN_HEALTH_CHECKS=ENV.bool('DATABASE_CONN_HEALTH_CHECKS', True),
+)
+
+if DATABASE_POOL['ENABLED'] and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DATABASE_POOL['MIN_SIZE'],
+        'max_size': DATABASE_POOL['MAX_SIZE'],
+        'timeout': DATABASE_POOL['TIMEOUT'],
+        'max_idle': DATABASE_POOL['MAX_IDLE'],
+        'max_lifetime': DATABASE_POOL['MAX_LIFETIME'],
+        'check': ConnectionPool.check_connection,
+    }
+
+# Read replicas, one URL per replica. Views decorated with
+# core.routers.read_replica read from them, see DATABASE_ROUTING.
+for index, url in enumerate(ENV.list('DATABASE_REPLICA_URLS', default=[])):
+    replica = ENV.db_url_config(url)
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        **replica,
+        'OPTIONS': {**DATABASES['default'].get('OPTIONS', {}), **replica.get('OPTIONS', {})},
+    }
+
+# Shared between workers in production, e.g. CACHE_URL=redis://redis:6379/1
+CACHES = {
+    'default': ENV.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+# Users are pinned to the primary for PIN_SECONDS after writing their account,
+# replicas lagging more than MAX_LAG seconds are skipped. The pin cache
+# must be shared between processes in production.
+DATABASE_ROUTING = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': ENV.float('DATABASE_REPLICA_PIN_SECONDS', 5.0),
+    'MAX_LAG': ENV.float('DATABASE_REPLICA_MAX_LAG', 2.0),
+    'LAG_CHECK_INTERVAL': ENV.float('DATABASE_REPLICA_LAG_CHECK_INTERVAL', 1.0),
+    'CACHE_ALIAS': ENV.str('DATABASE_ROUTING_CACHE_ALIAS', 'default'),
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -99,9 +176,21 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing runs on a bounded thread pool, see accounts.hashing
+PASSWORD_HASHING = {
+    'WORKERS': ENV.int('PASSWORD_HASHING_WORKERS', 4),
+    'MAX_PENDING': ENV.int('PASSWORD_HASHING_MAX_PENDING', 32),
+}
+
 # User settings
 AUTH_USER_MODEL = 'accounts.User'
 
+# accounts.UserToken lifetimes by purpose
+USER_TOKEN_LIFETIMES = {
+    'email_confirmation': timedelta(days=7),
+    'reset_password': timedelta(hours=24),
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -125,12 +214,60 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'collectstatic')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media is authorized by core.views.media_view, the bytes are sent by nginx
+# (X-Accel-Redirect) or Apache / lighttpd (X-Sendfile), by Django otherwise
+MEDIA_SERVING = {
+    'BACKEND': ENV.str('MEDIA_SERVING_BACKEND', 'django'),  # django, nginx or sendfile
+    'INTERNAL_URL': '/protected-media/',  # nginx internal location aliasing MEDIA_ROOT
+    # prefixes readable by anyone with the URL, the rest is for staff only
+    'PUBLIC': ('blobs/', 'images/'),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600
+# Request bodies besides uploaded files, e.g. JSON payloads
+DATA_UPLOAD_MAX_MEMORY_SIZE = ENV.int('DATA_UPLOAD_MAX_MEMORY_SIZE', 2621440)
+
+# Uploaded files are always streamed to temporary files, see core.uploads
+FILE_UPLOAD_HANDLERS = ['core.uploads.TemporaryFileUploadHandler']
+UPLOADS = {
+    'MAX_FILE_SIZE': ENV.int('UPLOAD_MAX_FILE_SIZE', 10 * 1024 * 1024),
+    # resumable upload sessions, see core.uploads
+    'SESSION_ROOT': ENV.str('UPLOAD_SESSION_ROOT', os.path.join(BASE_DIR, 'uploads')),
+    'SESSION_TTL': ENV.int('UPLOAD_SESSION_TTL', 24 * 3600),  # seconds
+    'CHECKSUM_ALGORITHMS': ('sha1', 'sha256'),
+}
+
+# Content-addressed media files, see core.blobs
+BLOBS = {
+    'ROOT': 'blobs',  # directory in MEDIA_ROOT
+    'SHARD_DEPTH': 2,  # levels of two hex digit subdirectories
+    'GRACE': ENV.int('BLOB_GRACE', 3600),  # seconds unreferenced files are kept
+}
+
+# Avatar validation and background processing, see accounts.avatars
+AVATARS = {
+    'MAX_SIZE': ENV.int('AVATAR_MAX_SIZE', 5 * 1024 * 1024),
+    'FORMATS': ('JPEG', 'PNG'),
+    'MAX_PIXELS': ENV.int('AVATAR_MAX_PIXELS', 25_000_000),
+    'MAX_DIMENSION': ENV.int('AVATAR_MAX_DIMENSION', 1024),  # longest side after processing
+    # square thumbnails generated for every size in every format
+    'VARIANT_SIZES': tuple(ENV.list('AVATAR_VARIANT_SIZES', cast=int, default=[64, 128, 512])),
+    'VARIANT_FORMATS': ('WEBP', 'JPEG'),
+    'WORKERS': ENV.int('AVATAR_WORKERS', 2),  # processes resizing images
+    'BATCH_SIZE': ENV.int('AVATAR_BATCH_SIZE', 20),
+    'POLL_INTERVAL': ENV.float('AVATAR_POLL_INTERVAL', 2.0),
+    'MAX_ATTEMPTS': ENV.int('AVATAR_MAX_ATTEMPTS', 5),
+    'BACKOFF': 30,  # seconds, doubled on every failed attempt
+    'MAX_BACKOFF': 3600,
+    'LEASE': 300,
+    # days sent messages and dead letters are kept, purged by `send_emails`
+    'RETENTION': ENV.int('EMAIL_OUTBOX_RETENTION', 7),
+    'PURGE_INTERVAL': 3600,  # seconds
+}
 
 # https://github.com/vintasoftware/safari-samesite-cookie-issue
 CSRF_COOKIE_SAMESITE = None
@@ -186,6 +323,18 @@ NINJA_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Authenticated users cache, see accounts.authentication. CACHE_ALIAS must
+# name a cache shared by all workers (e.g. Redis), users are loaded from
+# the database on every request while it's unset
+AUTH_USER_CACHE = {
+    'TIMEOUT': ENV.int('AUTH_USER_CACHE_TIMEOUT', 60),
+    'CACHE_ALIAS': ENV.str('AUTH_USER_CACHE_ALIAS', None),
+}
+
+if AUTH_USER_CACHE['CACHE_ALIAS'] and not DEBUG:
+    if CACHES[AUTH_USER_CACHE['CACHE_ALIAS']]['BACKEND'].endswith(('LocMemCache', 'DummyCache')):
+        raise ImproperlyConfigured('AUTH_USER_CACHE_ALIAS must name a cache shared by all workers.')
+
 APPEND_SLASH = True
 
 NINJA_PAGINATION_PER_PAGE = 20
@@ -202,6 +351,21 @@ EMAIL_HOST_PASSWORD = ENV.str('EMAIL_HOST_PASSWORD', '')
 EMAIL_USE_TLS = ENV.bool('EMAIL_USE_TLS', False)
 EMAIL_REPLY_TO = 'contact@project.com'
 
+# Outgoing emails are stored in core.OutgoingEmail and delivered by `manage.py send_emails`
+EMAIL_OUTBOX = {
+    'ENABLED': ENV.bool('EMAIL_OUTBOX_ENABLED', True),
+    'WORKERS': ENV.int('EMAIL_OUTBOX_WORKERS', 4),
+    'BATCH_SIZE': ENV.int('EMAIL_OUTBOX_BATCH_SIZE', 50),
+    'POLL_INTERVAL': ENV.float('EMAIL_OUTBOX_POLL_INTERVAL', 2.0),
+    'MAX_ATTEMPTS': ENV.int('EMAIL_OUTBOX_MAX_ATTEMPTS', 8),
+    'BACKOFF': 30,  # seconds, doubled on every failed attempt
+    'MAX_BACKOFF': 3600,
+    'LEASE': 300,
+    # days sent messages and dead letters are kept, purged by `send_emails`
+    'RETENTION': ENV.int('EMAIL_OUTBOX_RETENTION', 7),
+    'PURGE_INTERVAL': 3600,  # seconds
+}
+
 SITE_NAME = 'Django Ninja Project'
 
 DEFAULT_CLIENT_DOMAIN = 'localhost:3000'
@@ -2,5 +2,11 @@ from project.settings import *  # noqa: F403
 
 DEBUG = True
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+EMAIL_OUTBOX = {**EMAIL_OUTBOX, 'ENABLED': False}  # noqa: F405
 MEDIA_ROOT = os.path.join(MEDIA_ROOT, 'test')  # noqa: F405
+UPLOADS = {**UPLOADS, 'SESSION_ROOT': os.path.join(MEDIA_ROOT, 'uploads')}  # noqa: F405
 USE_TZ = False
+AUTH_USER_CACHE = {**AUTH_USER_CACHE, 'CACHE_ALIAS': 'default'}  # noqa: F405
+
+# Replica sharing the test database, routing to it is enabled per test
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}  # noqa: F405